@@ -2,3 +2,8 @@
 
 from . import models
 from . import lib
+
+
+def uninstall_hook(cr, registry):
+    # the triggers of the change counters are on the tables of other modules
+    cr.execute("DROP FUNCTION IF EXISTS base_api_change_log() CASCADE")
@@ -5,21 +5,21 @@
     "name": """Base API""",
     "summary": """Basic function and methods of API for openapi or XML-RPC""",
     "category": "Hidden",
-    "version": "14.0.1.0.1",
+    "version": "14.0.1.10.1",
     "application": False,
     "author": "IT-Projects LLC, Anvar Kildebekov",
     "support": "apps@itpp.dev",
     "website": "https://apps.odoo.com/apps/modules/13.0/base_api/",
     "license": "LGPL-3",
     "depends": [],
-    "external_dependencies": {"python": [], "bin": []},
-    "data": [],
+    "external_dependencies": {"python": ["jsonschema"], "bin": []},
+    "data": ["security/ir.model.access.csv", "data/ir_cron.xml"],
     "demo": [],
     "qweb": [],
     "post_load": None,
     "pre_init_hook": None,
     "post_init_hook": None,
-    "uninstall_hook": None,
+    "uninstall_hook": "uninstall_hook",
     "auto_install": False,
     "installable": True,
 }
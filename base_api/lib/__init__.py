@@ -1 +1,4 @@
+from . import batch
+from . import compression
 from . import pinguin
+from . import schema
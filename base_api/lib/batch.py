@@ -0,0 +1,76 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+"""Execution of several API methods of ``Base`` in one call.
+
+The result of a previous step is referenced as ``{"$ref": [step, key, ...]}``:
+the step index followed by the indexes or keys to follow in its result.
+"""
+
+# Methods of ``Base`` that can be called in a batch
+BATCH_METHODS = (
+    "search_or_create",
+    "create_or_update_by_external_id",
+    "search_read_nested",
+    "read_by_external_ids",
+    "read_group_nested",
+)
+
+REF_KEY = "$ref"
+
+
+def resolve_refs(value, results):
+    """Replace the references in the arguments of a step by the results of
+    the previous steps.
+    :param value: The arguments of the step.
+    :param list results: The results of the previous steps.
+    :returns: The arguments with the references replaced.
+    :raise: ValueError if a reference is invalid.
+    """
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return get_ref(value[REF_KEY], results)
+        return {key: resolve_refs(item, results) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve_refs(item, results) for item in value)
+    return value
+
+
+def get_ref(path, results):
+    if not isinstance(path, (list, tuple)) or not path:
+        raise ValueError("Invalid reference: %r" % (path,))
+    step = path[0]
+    if not isinstance(step, int) or not 0 <= step < len(results):
+        raise ValueError("Reference to a step not executed yet: %r" % (path,))
+    value = results[step]
+    for key in path[1:]:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("Invalid reference: %r" % (path,))
+    return value
+
+
+def run(env, operations):
+    """Execute the operations in order, in the transaction of ``env``.
+    :param odoo.api.Environment env: The environment.
+    :param list operations: dicts with the ``model``, the ``method`` in
+        ``BATCH_METHODS`` and optionally its ``args`` and ``kwargs``.
+    :returns: The results of the operations.
+    :rtype: list
+    :raise: ValueError if an operation is invalid.
+    """
+    results = []
+    for step, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise ValueError("Step %d: operations must be dictionaries" % step)
+        model, method = operation.get("model"), operation.get("method")
+        if method not in BATCH_METHODS:
+            raise ValueError("Step %d: method not allowed in batches: %s" % (step, method))
+        if model not in env:
+            raise ValueError("Step %d: unknown model: %s" % (step, model))
+        try:
+            args = resolve_refs(list(operation.get("args") or []), results)
+            kwargs = resolve_refs(dict(operation.get("kwargs") or {}), results)
+        except ValueError as e:
+            raise ValueError("Step %d: %s" % (step, e))
+        results.append(getattr(env[model], method)(*args, **kwargs))
+    return results
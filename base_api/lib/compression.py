@@ -0,0 +1,147 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+"""Content-Encoding negotiation and streaming compression of API responses.
+
+gzip is always available; zstd and br are used when the ``zstandard`` and
+``brotli`` packages are installed. They are imported on first use.
+"""
+import functools
+import time
+import zlib
+
+# Supported encodings, by order of preference, with their default level
+ENCODINGS = ("zstd", "br", "gzip")
+DEFAULT_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+# Levels compared by ``benchmark``
+BENCHMARK_LEVELS = {"zstd": (1, 3, 9, 19), "br": (1, 5, 9, 11), "gzip": (1, 6, 9)}
+
+# Smaller bodies are sent as they are: compression would not pay for its CPU
+MIN_SIZE = 1024
+CHUNK_SIZE = 64 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def is_available(encoding):
+    """Whether the package needed by an encoding is installed."""
+    try:
+        if encoding == "zstd":
+            import zstandard  # noqa: F401
+        elif encoding == "br":
+            import brotli  # noqa: F401
+        elif encoding != "gzip":
+            return False
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate_encoding(accept_encoding):
+    """Choose the encoding of a response from an ``Accept-Encoding`` header.
+    :param str accept_encoding: The header value, e.g. ``gzip;q=0.8, br``.
+    :returns: The encoding with the highest quality value, by order of
+        ``ENCODINGS`` for equal values, or None to send the body as it is.
+    :rtype: str
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, __, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(encoding, wildcard), -index, encoding)
+        for index, encoding in enumerate(ENCODINGS)
+        if is_available(encoding)
+    ]
+    quality, __, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def get_compressor(encoding, level=None):
+    """Incremental compressor of an encoding.
+    :returns: tuple of functions (compress(bytes) -> bytes, flush() -> bytes).
+    :rtype: tuple
+    """
+    if level is None:
+        level = DEFAULT_LEVELS[encoding]
+    if encoding == "gzip":
+        # wbits=31: deflate with a gzip header and trailer
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+    if encoding == "zstd":
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        return compressor.compress, compressor.flush
+    if encoding == "br":
+        import brotli
+
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    raise ValueError("Unsupported content encoding: %s" % encoding)
+
+
+def compress_stream(chunks, encoding, level=None):
+    """Compress an iterable of chunks as they are produced.
+    :param chunks: iterable of bytes or str.
+    :param str encoding: One of ``ENCODINGS``.
+    :param int level: (optional). The compression level of the encoding.
+    :returns: generator of compressed chunks.
+    """
+    compress, flush = get_compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compress(chunk)
+        if data:
+            yield data
+    data = flush()
+    if data:
+        yield data
+
+
+def compress(body, encoding, level=None):
+    return b"".join(compress_stream([body], encoding, level))
+
+
+def benchmark(payload, encodings=None, repeat=3):
+    """Compare the CPU cost and the bytes saved by every encoding and level.
+    :param bytes payload: A representative response body.
+    :param tuple encodings: (optional). The encodings to compare, all the
+        available ones by default.
+    :param int repeat: Compressions timed per level, the best time is kept.
+    :returns: list of dicts with the encoding, level, size, ratio of the
+        original size, milliseconds and MB of payload per CPU second.
+    :rtype: list
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    result = []
+    for encoding in encodings or ENCODINGS:
+        if not is_available(encoding):
+            continue
+        for level in BENCHMARK_LEVELS[encoding]:
+            best = None
+            for dummy in range(repeat):
+                start = time.process_time()
+                size = len(compress(payload, encoding, level))
+                elapsed = time.process_time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            result.append(
+                {
+                    "encoding": encoding,
+                    "level": level,
+                    "size": size,
+                    "ratio": size / (len(payload) or 1),
+                    "ms": best * 1000,
+                    "mb_per_s": len(payload) / 1e6 / (best or 1e-9),
+                }
+            )
+    return result
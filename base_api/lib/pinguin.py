@@ -7,35 +7,48 @@
 # pyling: disable=redefined-builtin
 
 
+import base64
 import collections
 import collections.abc
 import datetime
+import functools
+import hashlib
 
-import six
-import werkzeug.wrappers
-from psycopg2.extensions import ISOLATION_LEVEL_READ_COMMITTED
-
-import odoo
 from odoo.http import request
 
-try:
-    import simplejson as json
-except ImportError:
-    import json
+from . import compression
+
+# The json encoder is imported on first use so that loading the registry does
+# not pay for it on workers that never serve an API request. werkzeug and
+# psycopg2 are also imported where they are used, but odoo core loads them
+# anyway.
+
+
+def _json():
+    """The json module, simplejson if it is available."""
+    try:
+        import simplejson as json
+    except ImportError:
+        import json
+    return json
 
 
 # 4xx Client Errors
+CODE__invalid_spec = (
+    400,
+    "Invalid Field Spec",
+    "The field spec supplied is not valid.",
+)
 CODE__obj_not_found = (
     404,
     "Object not found",
     "This object is not available on this instance.",
 )
-# 5xx Server errors
-CODE__invalid_spec = (
-    501,
-    "Invalid Field Spec",
-    "The field spec supplied is not valid.",
-)
+
+# A field of a spec resolved against the model: the field name, its
+# ``odoo.fields.Field``, the tuple of nodes of the nested spec (None for a
+# plain field) and whether the nested records are returned as a list.
+SpecNode = collections.namedtuple("SpecNode", ["name", "field", "children", "many"])
 
 
 def error_response(status, error, error_descrip):
@@ -48,10 +61,87 @@ def error_response(status, error, error_descrip):
     .. _response object:
         http://werkzeug.pocoo.org/docs/0.14/wrappers/#module-werkzeug.wrappers
     """
-    return werkzeug.wrappers.Response(
-        status=status,
-        content_type="application/json; charset=utf-8",
-        response=json.dumps({"error": error, "error_descrip": error_descrip}),
+    return make_response(
+        _json().dumps({"error": error, "error_descrip": error_descrip}), status=status
+    )
+
+
+def make_response(
+    body,
+    status=200,
+    content_type="application/json; charset=utf-8",
+    accept_encoding=None,
+    min_size=compression.MIN_SIZE,
+    level=None,
+):
+    """Response compressed with the best encoding accepted by the client.
+    :param body: The body: bytes, str or an iterable of chunks, which is
+        compressed and sent chunk by chunk.
+    :param int status: The status code.
+    :param str content_type: The content type.
+    :param str accept_encoding: (optional). The ``Accept-Encoding`` header,
+        read from the current request by default.
+    :param int min_size: Bodies smaller than this are not compressed.
+    :param int level: (optional). The compression level of the encoding.
+    :returns: The werkzeug response object.
+    :rtype: werkzeug.wrappers.Response
+    """
+    import werkzeug.wrappers
+
+    if accept_encoding is None and request:
+        accept_encoding = request.httprequest.headers.get("Accept-Encoding")
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    encoding = compression.negotiate_encoding(accept_encoding)
+    if isinstance(body, bytes) and len(body) < min_size:
+        encoding = None
+    response = werkzeug.wrappers.Response(status=status, content_type=content_type)
+    response.vary.add("Accept-Encoding")
+    if isinstance(body, bytes):
+        if encoding:
+            body = compression.compress(body, encoding, level)
+            response.headers["Content-Encoding"] = encoding
+        response.set_data(body)
+    else:
+        if encoding:
+            body = compression.compress_stream(body, encoding, level)
+            response.headers["Content-Encoding"] = encoding
+        # streamed with chunked transfer encoding
+        response.response = body
+    return response
+
+
+def iter_json_list(values, chunk_size=compression.CHUNK_SIZE):
+    """Encode a list as JSON in chunks of about ``chunk_size`` bytes, to
+    stream large results through ``make_response``.
+    :param iterable values: The items of the list.
+    :returns: generator of str.
+    """
+    json = _json()
+    buffer, size = ["["], 1
+    for index, value in enumerate(values):
+        item = ("," if index else "") + json.dumps(value)
+        buffer.append(item)
+        size += len(item)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def invalid_spec(error_descrip):
+    """Build the client error raised for an invalid field spec.
+    :param str error_descrip: What is wrong with the spec.
+    :returns: The exception, carrying an ``error_response``.
+    :rtype: werkzeug.exceptions.BadRequest
+    """
+    import werkzeug.exceptions
+
+    err = list(CODE__invalid_spec)
+    err[2] = error_descrip
+    return werkzeug.exceptions.BadRequest(
+        description=error_descrip, response=error_response(*err)
     )
 
 
@@ -60,57 +150,65 @@ def validate_extra_field(field):
     :param str field: The name of the field.
     :returns: None, if validated, otherwise raises.
     :rtype: None
-    :raise: werkzeug.exceptions.HTTPException if field is invalid.
+    :raise: werkzeug.exceptions.BadRequest if field is invalid.
     """
     if not isinstance(field, str):
-        return werkzeug.exceptions.HTTPException(
-            response=error_response(*CODE__invalid_spec)
+        raise invalid_spec(
+            "Extra fields must be strings. Found: %r" % type(field).__name__
         )
 
 
 def validate_spec(model, spec):
-    """Validates a spec for a given model.
+    """Validates one level of a spec for a given model.
     :param object model: (:obj:`Model`) The model against which to validate.
     :param list spec: The spec to validate.
     :returns: None, if validated, otherwise raises.
     :rtype: None
-    :raise: Exception:
+    :raise: werkzeug.exceptions.BadRequest:
                     * if the tuple representing the field does not have length 2.
                     * if the second part of the tuple representing the field is not a list or tuple.
-                    * if if a tuple representing a field consists of two parts, but the first part is not a relative field.
-                    * if if the second part of the tuple representing the field is of type tuple, but the field is the ratio 2many.
-                    * if if the field is neither a string nor a tuple.
+                    * if the model has no such field.
+                    * if a tuple representing a field consists of two parts, but the first part is not a relational field.
+                    * if the second part of the tuple representing the field is of type tuple, but the field is a 2many.
+                    * if the field is neither a string nor a tuple.
     """
     self = model
     for field in spec:
         if isinstance(field, tuple):
             # Syntax checks
             if len(field) != 2:
-                raise Exception(
-                    "Tuples representing fields must have length 2. (%r)" % field
+                raise invalid_spec(
+                    "Tuples representing fields must have length 2. (%r)" % (field,)
                 )
             if not isinstance(field[1], (tuple, list)):
-                raise Exception(
-                    """Tuples representing fields must have a tuple wrapped in
-                    a list or a bare tuple as it's second item. (%r)"""
-                    % field
+                raise invalid_spec(
+                    "Tuples representing fields must have a tuple wrapped in "
+                    "a list or a bare tuple as it's second item. (%r)" % (field,)
                 )
             # Validity checks
-            fld = self._fields[field[0]]
+            fld = self._fields.get(field[0])
+            if fld is None:
+                raise invalid_spec(
+                    'The model "%s" has no such field: "%s".' % (self._name, field[0])
+                )
             if not fld.relational:
-                raise Exception(
+                raise invalid_spec(
                     "Tuples representing fields can only specify relational fields. (%r)"
-                    % field
+                    % (field,)
                 )
             if isinstance(field[1], tuple) and fld.type in ["one2many", "many2many"]:
-                raise Exception(
+                raise invalid_spec(
                     "Specification of a 2many record cannot be a bare tuple. (%r)"
-                    % field
+                    % (field,)
                 )
-        elif not isinstance(field, six.string_types):
-            raise Exception(
+        elif not isinstance(field, str):
+            raise invalid_spec(
                 "Fields are represented by either a strings or tuples. Found: %r"
-                % type(field)
+                % type(field).__name__
+            )
+        elif field not in self._fields:
+            raise invalid_spec(
+                'The model "%s" has no such field: "%s".' % (self._name, field)
             )
 
 
@@ -151,16 +249,32 @@ def transform_strfields_to_dict(fields_list, delim="/"):
     """
     dct = {}
     for field in fields_list:
-        parts = field.split(delim)
-        data = None
-        for part in parts[::-1]:
-            if part == ".id":
-                part = "id"
-            data = {part: data}
-        update(dct, data)
+        node = dct
+        parts = ["id" if part == ".id" else part for part in field.split(delim)]
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        # a plain field listed after its nested fields keeps the subtree
+        node.setdefault(parts[-1], None)
     return dct
 
 
+@functools.lru_cache(maxsize=512)
+def parse_strfields(fields, delim="/"):
+    """Cached ``transform_strfields_to_dict`` for a tuple of string fields.
+    The same field lists are sent again and again by the API clients, so the
+    paths are split once per (fields, delimiter) and the result is shared.
+    :param tuple fields: The string fields.
+    :param str delim: The delimiter of nested fields.
+    :returns: The dict of transformed fields. It is shared between callers
+        and must not be modified.
+    :rtype: dict
+    """
+    return transform_strfields_to_dict(fields, delim)
+
+
 def transform_dictfields_to_list_of_tuples(record, dct, ENV=False):
     """Transform fields dictionary to list.
     for {
@@ -180,21 +294,282 @@ def transform_dictfields_to_list_of_tuples(record, dct, ENV=False):
     :returns: The list of transformed fields.
     :rtype: list
     """
-    fields_with_meta = {
-        k: meta for k, meta in record.fields_get().items() if k in dct.keys()
-    }
     result = {}
     for key, value in dct.items():
         if isinstance(value, dict):
-            model_obj = get_model_for_read(fields_with_meta[key]["relation"], ENV)
+            fld = record._fields.get(key)
+            if fld is None or not fld.relational:
+                raise invalid_spec(
+                    'The model "%s" has no such relational field: "%s".'
+                    % (record._name, key)
+                )
+            model_obj = get_model_for_read(fld.comodel_name, ENV)
             inner_result = transform_dictfields_to_list_of_tuples(model_obj, value, ENV)
-            is_2many = fields_with_meta[key]["type"].endswith("2many")
+            is_2many = fld.type.endswith("2many")
             result[key] = list(inner_result) if is_2many else tuple(inner_result)
         else:
             result[key] = value
     return [(key, value) if value else key for key, value in result.items()]
 
 
+def compile_spec(model, spec, include_fields=(), exclude_fields=(), delim="/"):
+    """Validate a whole spec tree once and resolve it into a plan.
+    :param odoo.models.Model model: The model of the root records.
+    :param tuple spec: The field spec, with tuples or delimited strings.
+    :param tuple include_fields: The extra fields.
+    :param tuple exclude_fields: The excluded fields.
+    :param str delim: The delimiter of nested string fields.
+    :returns: The plan: a tuple of ``SpecNode``.
+    :rtype: tuple
+    :raise: werkzeug.exceptions.BadRequest if the spec is invalid.
+    """
+    for field in tuple(include_fields) + tuple(exclude_fields):
+        validate_extra_field(field)
+    _spec = [fld for fld in spec if fld not in exclude_fields] + list(include_fields)
+    if [x for x in _spec if isinstance(x, str) and delim in x]:
+        if not all(isinstance(x, str) for x in _spec):
+            raise invalid_spec(
+                "Delimited string fields cannot be mixed with tuples in a spec."
+            )
+        _spec = transform_dictfields_to_list_of_tuples(
+            model, parse_strfields(tuple(_spec), delim), model.env
+        )
+    return _compile_spec_level(model, _spec)
+
+
+def _compile_spec_level(model, spec):
+    validate_spec(model, spec)
+    plan = []
+    for field in spec:
+        if isinstance(field, tuple):
+            fld = model._fields[field[0]]
+            children = _compile_spec_level(model.env[fld.comodel_name], field[1])
+            plan.append(SpecNode(field[0], fld, children, isinstance(field[1], list)))
+        else:
+            plan.append(SpecNode(field, model._fields[field], None, False))
+    return tuple(plan)
+
+
+class FrozenList(tuple):
+    """Hashable stand-in for a list of a spec, e.g. the sub-spec of a 2many
+    field. It is never equal to a plain tuple, as list and tuple sub-specs
+    give different plans."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is FrozenList and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((FrozenList, tuple(self)))
+
+
+def freeze_spec(spec):
+    """Return a hashable copy of a spec, with its lists as ``FrozenList``."""
+    if isinstance(spec, list):
+        return FrozenList(freeze_spec(item) for item in spec)
+    if isinstance(spec, tuple) and not isinstance(spec, FrozenList):
+        return tuple(freeze_spec(item) for item in spec)
+    return spec
+
+
+def thaw_spec(spec):
+    """Reverse ``freeze_spec``."""
+    if isinstance(spec, FrozenList):
+        return [thaw_spec(item) for item in spec]
+    if isinstance(spec, tuple):
+        return tuple(thaw_spec(item) for item in spec)
+    return spec
+
+
+def get_plan(model_obj, spec, include_fields=(), exclude_fields=(), delim="/"):
+    """Return the plan of a spec from the registry cache. Lists in the spec,
+    as the sub-specs of 2many fields, are frozen to be part of the key.
+    :param odoo.models.Model model_obj: The model of the root records.
+    :returns: The plan: a tuple of ``SpecNode``.
+    :rtype: tuple
+    """
+    include_fields, exclude_fields = tuple(include_fields), tuple(exclude_fields)
+    spec = freeze_spec(spec)
+    try:
+        hash((spec, include_fields, exclude_fields))
+    except TypeError:
+        # e.g. a dict in an invalid spec: rejected by the compilation
+        return compile_spec(
+            model_obj, thaw_spec(spec), include_fields, exclude_fields, delim
+        )
+    return model_obj._get_pinguin_plan(spec, include_fields, exclude_fields, delim)
+
+
+def _add_field_models(model_obj, field, models, context_keys, seen):
+    """Add the models and context keys a non-stored field is computed from.
+    :returns: False if the field is computed without declared dependencies.
+    :rtype: bool
+    """
+    if field in seen:
+        return True
+    seen.add(field)
+    depends, depends_context = field.get_depends(model_obj)
+    if field.compute and not depends:
+        return False
+    context_keys.update(depends_context)
+    return all(
+        _add_path_models(model_obj, path, models, context_keys, seen)
+        for path in depends
+    )
+
+
+def _add_path_models(model_obj, path, models, context_keys, seen):
+    """Add the models read to follow a dotted field path, as in domains and
+    in the dependencies of computed fields.
+    :returns: False if one of its fields has unknown dependencies.
+    :rtype: bool
+    """
+    for name in path.split("."):
+        field = model_obj._fields.get(name)
+        if field is None:
+            # invalid paths are reported by the search
+            return True
+        if not field.store and not _add_field_models(
+            model_obj, field, models, context_keys, seen
+        ):
+            return False
+        if not field.relational:
+            break
+        model_obj = model_obj.env[field.comodel_name]
+        models.add(model_obj._name)
+    return True
+
+
+def get_read_dependencies(model_obj, plan, domain=()):
+    """Models whose data a read depends on: the models of the nested fields
+    of the plan, of the fields followed by the domain and of the
+    dependencies of non-stored fields, plus the context keys these fields
+    depend on.
+    :returns: (set of model names, set of context keys), or None if a
+        non-stored field has no declared dependencies.
+    :rtype: tuple
+    """
+    models, context_keys, seen = {model_obj._name}, set(), set()
+
+    def add_plan(model_obj, plan):
+        for node in plan:
+            if not node.field.store and not _add_field_models(
+                model_obj, node.field, models, context_keys, seen
+            ):
+                return False
+            if node.children is not None:
+                comodel_obj = model_obj.env[node.field.comodel_name]
+                models.add(comodel_obj._name)
+                if not add_plan(comodel_obj, node.children):
+                    return False
+        return True
+
+    if not add_plan(model_obj, plan):
+        return None
+    for leaf in domain or ():
+        if isinstance(leaf, (list, tuple)) and leaf and isinstance(leaf[0], str):
+            if not _add_path_models(model_obj, leaf[0], models, context_keys, seen):
+                return None
+    return models, context_keys
+
+
+def get_versions(env, model_names):
+    """Versions of the content of the tables of models, from the change
+    counters of ``base.api.change``. Creations, deletions and writes, through
+    the ORM or not, change them when they commit, whatever their
+    ``write_date``. Pending ORM writes are flushed first.
+    :param env: The environment.
+    :param model_names: The names of the models.
+    :returns: list of (table name, version), or None if some models have no
+        table or some tables are not tracked yet.
+    :rtype: list
+    """
+    tables = set()
+    for name in model_names:
+        if not env[name]._auto:
+            return None
+        tables.add(env[name]._table)
+    env["base"].flush()
+    return env["base.api.change"].sudo()._get_versions(sorted(tables))
+
+
+def get_etag(model_obj, plan, domain, *args):
+    """Validator of the result of a read: a hash of its arguments, of the
+    user, their groups and the context the fields depend on, and of the
+    versions of the models read by the plan and the domain and of the
+    record rules (see ``get_versions``).
+    :param odoo.models.Model model_obj: The model of the root records.
+    :param tuple plan: The plan built by ``compile_spec``.
+    :param list domain: The domain of the read.
+    :param args: The other arguments of the read (limit, order, ...).
+    :returns: The quoted ETag, or None if the result cannot be versioned.
+    :rtype: str
+    """
+    dependencies = get_read_dependencies(model_obj, plan, domain)
+    if dependencies is None:
+        return None
+    models, context_keys = dependencies
+    env = model_obj.env
+    versions = get_versions(env, models | {"ir.rule"})
+    if versions is None:
+        return None
+    key = [
+        model_obj._name,
+        repr(plan),
+        domain,
+        args,
+        env.uid,
+        env.user.groups_id.ids,
+        env.company.id,
+        env.context.get("lang"),
+        [(name, env.context.get(name)) for name in sorted(context_keys)],
+        versions,
+    ]
+    digest = hashlib.sha1(_json().dumps(key, default=repr).encode("utf-8"))
+    return '"%s"' % digest.hexdigest()
+
+
+def etag_matches(etag, if_none_match):
+    """Whether an ``If-None-Match`` header matches an ETag.
+    :param str etag: The quoted ETag of the current result.
+    :param str if_none_match: The header value: ``*`` or a list of ETags,
+        weak ones included.
+    :rtype: bool
+    """
+    if not etag or not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags
+    )
+
+
+def make_conditional_response(etag, if_none_match, get_body, **kwargs):
+    """Answer 304 when the client already has the current result, otherwise
+    a response with the body returned by ``get_body`` and its ETag.
+    :param str etag: The ETag of the current result, see ``get_etag``.
+    :param str if_none_match: The ``If-None-Match`` header of the request.
+    :param callable get_body: Builds the body, only called when needed.
+    :param dict kwargs: Keyword arguments of ``make_response``.
+    :returns: The werkzeug response object.
+    :rtype: werkzeug.wrappers.Response
+    """
+    if etag_matches(etag, if_none_match):
+        import werkzeug.wrappers
+
+        response = werkzeug.wrappers.Response(status=304)
+        del response.headers["Content-Type"]
+    else:
+        response = make_response(get_body(), **kwargs)
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
 #######################
 # Pinguin ORM Wrapper #
 #######################
@@ -217,6 +592,8 @@ def get_dictlist_from_model(model, spec, **kwargs):
     :param tuple kwargs['exclude_fields']: (optional). The excluded fields.
     :param char kwargs['delimeter']: delimeter of nested fields.
     :param object kwargs['env']: Model's environment.
+    :param dict kwargs['included']: (optional). Side table of the nested records,
+        see ``get_dictlist_from_records``.
     :returns: The list of python dictionaries of the requested values.
     :rtype: list
     """
@@ -232,32 +609,379 @@ def get_dictlist_from_model(model, spec, **kwargs):
     ENV = kwargs.get("env", False)
 
     model_obj = get_model_for_read(model, ENV)
+    plan = get_plan(model_obj, spec, include_fields, exclude_fields, delim)
 
     records = model_obj.sudo().search(domain, offset=offset, limit=limit, order=order)
 
+    return get_dictlist_from_records(records, plan, kwargs.get("included"))
+
+
+def get_conditional_dictlist_from_model(model, spec, if_none_match=None, **kwargs):
+    """Like ``get_dictlist_from_model``, skipping the search and the
+    serialization when ``if_none_match`` matches the ETag of the result.
+    :param str if_none_match: (optional). The ETag of the result the client has.
+    :returns: tuple (ETag, list of dictionaries or None if not modified).
+    :rtype: tuple
+    """
+    model_obj = get_model_for_read(model, kwargs.get("env", False))
+    plan = get_plan(
+        model_obj,
+        spec,
+        kwargs.get("include_fields", ()),
+        kwargs.get("exclude_fields", ()),
+        kwargs.get("delimeter", "/"),
+    )
+    etag = get_etag(
+        model_obj,
+        plan,
+        kwargs.get("domain") or [],
+        kwargs.get("offset", 0),
+        kwargs.get("limit"),
+        kwargs.get("order"),
+        kwargs.get("included") is not None,
+    )
+    if etag_matches(etag, if_none_match):
+        return etag, None
+    return etag, get_dictlist_from_model(model, spec, **kwargs)
+
+
+def get_dictlist_from_records(records, plan, included=None):
+    """Serialize records according to a plan.
+    A related record is serialized once per sub-spec: further references to it
+    share the same dictionary, which callers must not modify.
+    :param odoo.models.Model records: The records to serialize.
+    :param tuple plan: The plan built by ``compile_spec``.
+    :param dict included: (optional). If given, nested records are replaced by
+        their ids and their values are collected in it as
+        ``{model: {str(id): values}}``.
+    :returns: The list of python dictionaries of the requested values.
+    :rtype: list
+    """
     # Do some optimization for subfields
-    _prefetch = {}
-    for field in spec:
-        if isinstance(field, str):
+    for node in plan:
+        if node.children is not None:
+            records.mapped(node.name).read(
+                [child.name for child in node.children if child.field.store]
+            )
+
+    memo = {}
+    return [serialize_record(record, plan, memo, included) for record in records]
+
+
+# Formats of the columnar export, pyarrow is needed for all but "json"
+COLUMNAR_FORMATS = ("json", "arrow", "parquet")
+
+
+def flatten_plan(plan, delim="/", prefix=""):
+    """Flatten a plan into columns named by their delimited path.
+    Fields below a 2many are returned as one list per record, so nested
+    2many are not supported.
+    :param tuple plan: The plan built by ``compile_spec``.
+    :returns: list of (column name, tuple of the nodes from the root record).
+    :rtype: list
+    """
+    columns = []
+    for node in plan:
+        name = prefix + node.name
+        if node.children is None:
+            columns.append((name, (node,)))
             continue
-        _fld = records._fields[field[0]]
-        if _fld.relational:
-            _prefetch[_fld.comodel] = records.mapped(field[0]).ids
+        for child_name, path in flatten_plan(node.children, delim, name + delim):
+            if node.many and any(child.many for child in path[:-1]):
+                raise invalid_spec(
+                    'Columnar exports cannot nest 2many fields: "%s".' % child_name
+                )
+            columns.append((child_name, (node,) + path))
+    return columns
+
+
+def _column_value(record, path):
+    for index, node in enumerate(path[:-1]):
+        record = record[node.name]
+        if node.many:
+            return [_column_value(rec, path[index + 1 :]) for rec in record]
+    fld = path[-1].field
+    value = record[path[-1].name]
+    if fld.relational:
+        return (value.id or None) if fld.type.endswith("2one") else value.ids
+    if value is False and fld.type != "boolean":
+        return None
+    return value
+
 
-    for mod, ids in _prefetch.items():
-        get_model_for_read(mod, ENV).browse(ids).read()
+def _arrow_type(pa, path):
+    fld = path[-1].field
+    if fld.type in ("integer", "many2one"):
+        arrow_type = pa.int64()
+    elif fld.type in ("float", "monetary"):
+        arrow_type = pa.float64()
+    elif fld.type == "boolean":
+        arrow_type = pa.bool_()
+    elif fld.type == "date":
+        arrow_type = pa.date32()
+    elif fld.type == "datetime":
+        arrow_type = pa.timestamp("s")
+    elif fld.type in ("one2many", "many2many"):
+        arrow_type = pa.list_(pa.int64())
+    elif fld.type == "binary":
+        arrow_type = pa.binary()
+    else:
+        arrow_type = pa.string()
+    if any(node.many for node in path[:-1]):
+        arrow_type = pa.list_(arrow_type)
+    return arrow_type
 
+
+def _json_column_value(value):
+    if isinstance(value, list):
+        return [_json_column_value(item) for item in value]
+    if isinstance(value, datetime.date):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+# Columns of values from model
+def get_columns_from_model(model, spec, fmt="json", chunk_size=1000, **kwargs):
+    """Export records as columns instead of nested dictionaries.
+    Records are read chunk by chunk and the cache is emptied between chunks,
+    so the ORM cache does not grow with the number of records read from the
+    database. The result itself is returned in one piece: the columns for
+    "json", and for "arrow" and "parquet" the whole file, built in memory and
+    base64 encoded. Memory therefore still grows with the size of the
+    result; large exports should be paged with the domain. The "arrow" (IPC
+    stream) and "parquet" formats need pyarrow; without it the export falls
+    back to "json".
+    :param str model: The model to export.
+    :param tuple spec: The field spec, nested 2one fields become columns.
+    :param str fmt: One of ``COLUMNAR_FORMATS``.
+    :param int chunk_size: Number of records read at once.
+    :param dict kwargs: Keyword arguments.
+    :param list kwargs['domain']: (optional). The domain to filter on.
+    :param str kwargs['order']: (optional). The postgres order string.
+    :param char kwargs['delimeter']: delimeter of nested fields and of the
+        column names.
+    :param object kwargs['env']: Model's environment.
+    :returns: dict with the format used, the column names and the data:
+        ``{column: [values]}`` for "json", the base64 encoded content of the
+        file otherwise, as raw bytes cannot be sent over XML-RPC or JSON-RPC.
+    :rtype: dict
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise invalid_spec(
+            'Unsupported export format "%s", use one of: %s.'
+            % (fmt, ", ".join(COLUMNAR_FORMATS))
+        )
+    domain = kwargs.get("domain") or []
+    order = kwargs.get("order")
+    delim = kwargs.get("delimeter", "/")
+    ENV = kwargs.get("env", False)
+
+    model_obj = get_model_for_read(model, ENV).sudo()
+    plan = get_plan(model_obj, spec, delim=delim)
+    columns = flatten_plan(plan, delim)
+    names = [name for name, __ in columns]
+
+    pa = None
+    if fmt != "json":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            fmt = "json"
+
+    ids = model_obj.search(domain, order=order).ids
+
+    def iter_chunks():
+        for index in range(0, len(ids), chunk_size):
+            records = model_obj.browse(ids[index : index + chunk_size])
+            yield [[_column_value(rec, path) for rec in records] for __, path in columns]
+            # the whole cache: related models read through nested paths
+            # would keep growing otherwise. Pending writes are flushed first,
+            # invalidating would discard them.
+            model_obj.flush()
+            model_obj.invalidate_cache()
+
+    if pa is None:
+        data = {name: [] for name in names}
+        for chunk in iter_chunks():
+            for name, values in zip(names, chunk):
+                data[name].extend(_json_column_value(value) for value in values)
+        return {"format": "json", "columns": names, "data": data}
+
+    import io
+
+    schema = pa.schema([(name, _arrow_type(pa, path)) for name, path in columns])
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        import pyarrow.parquet
+
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    with writer:
+        for chunk in iter_chunks():
+            writer.write_table(pa.Table.from_pydict(dict(zip(names, chunk)), schema))
+    data = base64.b64encode(sink.getvalue()).decode("ascii")
+    return {"format": fmt, "columns": names, "data": data}
+
+
+# Aggregate functions that can be merged across the groups of a relation
+GROUP_AGGREGATES = ("sum", "min", "max", "count")
+
+
+def _parse_groupby(model_obj, groupby, delim):
+    """Validate the group-by paths: every hop but the last must be a many2one.
+    :returns: list of (path, list of path parts).
+    :rtype: list
+    """
     result = []
-    for record in records:
-        result += [
-            get_dict_from_record(
-                record, spec, include_fields, exclude_fields, ENV, delim
-            )
-        ]
+    for path in groupby:
+        if not isinstance(path, str):
+            raise invalid_spec("Group-by entries must be strings. Found: %r" % (path,))
+        parts = path.split(delim)
+        model = model_obj
+        for index, part in enumerate(parts):
+            # date granularity (``date:month``) is applied in SQL, on the first hop
+            fname = part.split(":")[0] if len(parts) == 1 else part
+            fld = model._fields.get(fname)
+            if fld is None:
+                raise invalid_spec(
+                    'The model "%s" has no such field: "%s".' % (model._name, fname)
+                )
+            if index < len(parts) - 1:
+                if fld.type != "many2one":
+                    raise invalid_spec(
+                        'Group-by paths can only follow many2one fields: "%s".' % path
+                    )
+                model = model.env[fld.comodel_name]
+        result.append((path, parts))
+    return result
 
+
+def _parse_aggregates(model_obj, aggregates):
+    """Validate the aggregates, given as ``field:function``.
+    :returns: list of (key, field name, function, read_group spec).
+    :rtype: list
+    """
+    result = []
+    for aggregate in aggregates:
+        if aggregate == "__count":
+            continue
+        fname, __, func = str(aggregate).partition(":")
+        func = func or "sum"
+        fld = model_obj._fields.get(fname)
+        if fld is None or not fld.store:
+            raise invalid_spec(
+                'The model "%s" has no such stored field: "%s".'
+                % (model_obj._name, fname)
+            )
+        if func not in GROUP_AGGREGATES:
+            raise invalid_spec(
+                'Unsupported aggregate "%s", use one of: %s.'
+                % (aggregate, ", ".join(GROUP_AGGREGATES))
+            )
+        alias = "%s_%s" % (fname, func)
+        result.append((aggregate, alias, func, "%s:%s(%s)" % (alias, func, fname)))
     return result
 
 
+def _resolve_path(model_obj, ids, parts):
+    """Follow a path of fields from the given records, one batched read per hop.
+    :returns: dict {id: value at the end of the path}.
+    :rtype: dict
+    """
+    mapping = {id_: id_ for id_ in ids}
+    model = model_obj
+    for part in parts:
+        targets = {target for target in mapping.values() if target}
+        fld = model._fields[part]
+        values = {}
+        for row in model.browse(targets).read([part]):
+            value = row[part]
+            if fld.type == "many2one":
+                value = value and value[0]
+            values[row["id"]] = value
+        mapping = {id_: values.get(target, False) for id_, target in mapping.items()}
+        if fld.type == "many2one":
+            model = model.env[fld.comodel_name]
+    return mapping
+
+
+def _merge_aggregate(func, current, value):
+    if current is None or current is False:
+        return value
+    if value is None or value is False:
+        return current
+    if func in ("sum", "count"):
+        return current + value
+    return min(current, value) if func == "min" else max(current, value)
+
+
+# Aggregated values from model
+def get_grouplist_from_model(model, groupby, aggregates, **kwargs):
+    """Aggregate records in SQL, grouped by fields or by paths through
+    many2one relations (e.g. ``partner_id/country_id``).
+    The records are grouped in SQL by the first hop of every path; these groups
+    are then mapped through the relations with one read per hop and merged.
+    :param str model: The model to aggregate.
+    :param tuple groupby: The group-by fields or delimited paths.
+    :param tuple aggregates: ``field:function`` with function in
+        ``GROUP_AGGREGATES``, plus ``__count`` (always returned).
+    :param dict kwargs: Keyword arguments.
+    :param list kwargs['domain']: (optional). The domain to filter on.
+    :param char kwargs['delimeter']: delimeter of nested fields.
+    :param object kwargs['env']: Model's environment.
+    :returns: The list of groups: the group-by values, the aggregates and ``__count``.
+    :rtype: list
+    """
+    domain = kwargs.get("domain") or []
+    delim = kwargs.get("delimeter", "/")
+    ENV = kwargs.get("env", False)
+
+    model_obj = get_model_for_read(model, ENV).sudo()
+    paths = _parse_groupby(model_obj, groupby, delim)
+    aggs = _parse_aggregates(model_obj, aggregates)
+    sql_groupby = list(collections.OrderedDict.fromkeys(parts[0] for __, parts in paths))
+
+    groups = model_obj.read_group(
+        domain, [spec for __, __, __, spec in aggs], sql_groupby, lazy=False
+    )
+
+    # map the first hop of every relation path to its final value
+    resolved = {}
+    for path, parts in paths:
+        if len(parts) > 1:
+            ids = {group[parts[0]][0] for group in groups if group[parts[0]]}
+            comodel = model_obj.env[model_obj._fields[parts[0]].comodel_name]
+            resolved[path] = _resolve_path(comodel, ids, parts[1:])
+
+    result = collections.OrderedDict()
+    for group in groups:
+        key = []
+        for path, parts in paths:
+            value = group[parts[0]]
+            if isinstance(value, tuple):
+                value = value[0]
+            if path in resolved:
+                value = resolved[path].get(value, False)
+            key.append(value)
+        key = tuple(key)
+        row = result.get(key)
+        if row is None:
+            row = collections.OrderedDict(
+                [(path, value) for (path, __), value in zip(paths, key)]
+            )
+            row["__count"] = 0
+            for aggregate, __, __, __ in aggs:
+                row[aggregate] = None
+            result[key] = row
+        row["__count"] += group["__count"]
+        for aggregate, alias, func, __ in aggs:
+            row[aggregate] = _merge_aggregate(func, row[aggregate], group[alias])
+    return list(result.values())
+
+
 # Get a model with special context
 def get_model_for_read(model, ENV=False):
     """Fetch a model object from the environment optimized for read.
@@ -273,6 +997,9 @@ def get_model_for_read(model, ENV=False):
     """
     if ENV:
         return ENV[model]
+    import werkzeug.exceptions
+    from psycopg2.extensions import ISOLATION_LEVEL_READ_COMMITTED
+
     cr, uid = request.cr, request.session.uid
     test_mode = request.registry.test_cr
     if not test_mode:
@@ -304,52 +1031,64 @@ def get_dict_from_record(
     :returns: The python dictionary representing the record according to the field spec.
     :rtype collections.OrderedDict
     """
-    map(validate_extra_field, include_fields + exclude_fields)
-    result = collections.OrderedDict([])
-    _spec = [fld for fld in spec if fld not in exclude_fields] + list(include_fields)
-    if list(filter(lambda x: isinstance(x, six.string_types) and delim in x, _spec)):
-        _spec = transform_dictfields_to_list_of_tuples(
-            record, transform_strfields_to_dict(_spec, delim), ENV
-        )
-    validate_spec(record, _spec)
+    plan = compile_spec(record, spec, include_fields, exclude_fields, delim)
+    return serialize_record(record, plan)
 
-    for field in _spec:
 
-        if isinstance(field, tuple):
+def serialize_record(record, plan, memo=None, included=None):
+    """Serialize one record according to an already validated plan.
+    :param odoo.models.Model record: The singleton record to load.
+    :param tuple plan: The plan built by ``compile_spec``.
+    :param dict memo: (optional). Related records already serialized, shared
+        between the records of one request.
+    :param dict included: (optional). Side table of the related records, see
+        ``get_dictlist_from_records``.
+    :returns: The python dictionary representing the record according to the plan.
+    :rtype collections.OrderedDict
+    """
+    result = collections.OrderedDict([])
+    for node in plan:
+        value = record[node.name]
+        if node.children is not None:
             # It's a 2many (or a 2one specified as a list)
-            if isinstance(field[1], list):
-                result[field[0]] = []
-                for rec in record[field[0]]:
-                    result[field[0]] += [
-                        get_dict_from_record(rec, field[1], (), (), ENV, delim)
-                    ]
+            if node.many:
+                result[node.name] = [
+                    serialize_related(rec, node.children, memo, included)
+                    for rec in value
+                ]
             # It's a 2one
-            if isinstance(field[1], tuple):
-                result[field[0]] = get_dict_from_record(
-                    record[field[0]], field[1], (), (), ENV, delim
-                )
-        # Normal field, or unspecified relational
-        elif isinstance(field, six.string_types):
-            if not hasattr(record, field):
-                raise odoo.exceptions.ValidationError(
-                    odoo._('The model "%s" has no such field: "%s".')
-                    % (record._name, field)
+            else:
+                result[node.name] = serialize_related(
+                    value, node.children, memo, included
                 )
+            continue
 
-            # result[field] = getattr(record, field)
-            if isinstance(record[field], datetime.date):
-                value = record[field].strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                value = record[field]
-
-            result[field] = value
-            fld = record._fields[field]
-            if fld.relational:
-                if fld.type.endswith("2one"):
-                    result[field] = value.id
-                elif fld.type.endswith("2many"):
-                    result[field] = value.ids
-            elif (value is False or value is None) and fld.type != "boolean":
-                # string field cannot be false in response json
-                result[field] = ""
+        # Normal field, or unspecified relational
+        fld = node.field
+        if isinstance(value, datetime.date):
+            value = value.strftime("%Y-%m-%d %H:%M:%S")
+        elif fld.relational:
+            value = value.id if fld.type.endswith("2one") else value.ids
+        elif (value is False or value is None) and fld.type != "boolean":
+            # string field cannot be false in response json
+            value = ""
+        result[node.name] = value
     return result
+
+
+def serialize_related(record, plan, memo=None, included=None):
+    """Serialize a related record once per (model, id, sub-spec).
+    :returns: The python dictionary of the record, or its id when ``included``
+        is given.
+    """
+    if memo is None:
+        return serialize_record(record, plan)
+    # plans are immutable and outlive the request, their identity is stable
+    key = (record._name, record.id, id(plan))
+    value = memo.get(key)
+    if value is None:
+        value = memo[key] = serialize_record(record, plan, memo, included)
+        if included is not None and record:
+            table = included.setdefault(record._name, {})
+            table.setdefault(str(record.id), collections.OrderedDict()).update(value)
+    return value if included is None else record.id
@@ -0,0 +1,97 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+"""JSON schemas of the values accepted by the API methods of ``Base``.
+
+jsonschema is imported when the first validator is compiled, not when the
+module is loaded.
+"""
+
+OPERATIONS = ("search_or_create", "create_or_update_by_external_id")
+
+# Odoo accepts False for an empty value of any field
+FIELD_SCHEMAS = {
+    "char": {"type": ["string", "boolean"]},
+    "text": {"type": ["string", "boolean"]},
+    "html": {"type": ["string", "boolean"]},
+    "selection": {"type": ["string", "integer", "boolean"]},
+    "integer": {"type": ["integer", "boolean"]},
+    "float": {"type": ["number", "boolean"]},
+    "monetary": {"type": ["number", "boolean"]},
+    "boolean": {"type": ["boolean", "integer"]},
+}
+
+
+def get_field_schema(field, operation):
+    """Schema of the value of one field for the given operation.
+    :param odoo.fields.Field field: The field.
+    :param str operation: The API method the values are passed to.
+    :returns: The JSON schema, empty (any value) for unconstrained types.
+    :rtype: dict
+    """
+    # external ids are accepted in place of database ids
+    by_xmlid = operation == "create_or_update_by_external_id"
+    if field.type == "many2one":
+        types = ["integer", "boolean"] + (["string"] if by_xmlid else [])
+        return {"type": types}
+    if field.type in ("one2many", "many2many"):
+        # create() also accepts a plain list of ids; external ids are only
+        # resolved in commands
+        items = ["array"] if by_xmlid else ["array", "integer"]
+        return {"type": ["array", "boolean"], "items": {"type": items}}
+    return FIELD_SCHEMAS.get(field.type, {})
+
+
+def build_vals_schema(model, operation):
+    """Schema of the ``vals`` dictionary of an API method for a model.
+    :param odoo.models.Model model: The model the values are written to.
+    :param str operation: One of ``OPERATIONS``.
+    :returns: The JSON schema.
+    :rtype: dict
+    """
+    if operation not in OPERATIONS:
+        raise ValueError("Unknown API operation: %s" % operation)
+    properties = {
+        name: get_field_schema(field, operation) for name, field in model._fields.items()
+    }
+    schema = {
+        "type": "object",
+        "properties": properties,
+        "additionalProperties": False,
+    }
+    if operation == "create_or_update_by_external_id":
+        properties["id"] = {"type": "string"}
+        schema["required"] = ["id"]
+    return schema
+
+
+def compile_validator(schema):
+    """Build a validator for a schema, checking its syntax once.
+    Tuples are accepted as arrays, as Python callers pass x2many commands
+    as tuples.
+    :param dict schema: The JSON schema.
+    :returns: The validator.
+    :rtype: jsonschema.protocols.Validator
+    """
+    import jsonschema
+
+    base = jsonschema.Draft7Validator
+    type_checker = base.TYPE_CHECKER.redefine(
+        "array", lambda checker, instance: isinstance(instance, (list, tuple))
+    )
+    validator_class = jsonschema.validators.extend(base, type_checker=type_checker)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def validate(validator, instance):
+    """Validate an instance, raising ValueError with the most relevant error.
+    :param validator: A validator built by ``compile_validator``.
+    :param instance: The values to validate.
+    :raise: ValueError if the values are invalid.
+    """
+    if validator.is_valid(instance):
+        return
+    import jsonschema
+
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    path = "/".join(str(part) for part in error.absolute_path)
+    raise ValueError("Invalid value{}: {}".format(path and " for " + path, error.message))
@@ -1,3 +1,5 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html)
 
 from . import base
+from . import base_api_job
+from . import base_api_change
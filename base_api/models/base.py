@@ -2,19 +2,86 @@
 # Copyright 2019 Anvar Kildebekov <https://it-projects.info/team/fedoranvar>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
 
-from odoo import api, models
+import hashlib
+import json
+import logging
 
-from ..lib import pinguin
+import psycopg2
+from psycopg2 import errorcodes
+
+from odoo import _, api, models, tools
+from odoo.exceptions import AccessError
+
+from ..lib import batch, pinguin, schema
+
+_logger = logging.getLogger(__name__)
 
 PREFIX = "__base_api__"
 
 
+class NaturalKeyConflict(psycopg2.errors.SerializationFailure):
+    """A concurrent transaction created the record with the same natural key
+    but it is not visible in the snapshot of the current one. Raised as a
+    serialization failure so that Odoo retries the request."""
+
+    pgcode = errorcodes.SERIALIZATION_FAILURE
+
+
 class Base(models.AbstractModel):
 
     _inherit = "base"
 
+    # Fields identifying a record in ``search_or_create``, e.g. ("code",).
+    # A unique index is created on them: they should be required fields.
+    _api_natural_key = ()
+
+    def _auto_init(self):
+        res = super()._auto_init()
+        if self._api_natural_key and self._auto:
+            self._create_api_natural_key_index()
+        return res
+
+    def _create_api_natural_key_index(self):
+        index_name = "%s_api_natural_key_uniq" % self._table
+        if len(index_name) > 63:
+            digest = hashlib.sha1(self._table.encode()).hexdigest()[:16]
+            index_name = "api_natural_key_%s" % digest
+        columns = ['"%s"' % self._fields[fname].name for fname in self._api_natural_key]
+        try:
+            with self.env.cr.savepoint(flush=False):
+                tools.create_unique_index(self.env.cr, index_name, self._table, columns)
+        except psycopg2.Error as e:
+            _logger.warning(
+                "Unable to create the unique index of the natural key of %s: %s",
+                self._name,
+                e,
+            )
+
+    @api.model
+    @tools.ormcache("operation")
+    def _get_api_validator(self, operation):
+        """Validator of the values of an API operation, compiled once per
+        model and registry."""
+        return schema.compile_validator(schema.build_vals_schema(self, operation))
+
+    @api.model
+    def _validate_api_vals(self, operation, vals):
+        schema.validate(self._get_api_validator(operation), vals)
+
+    @api.model
+    @tools.ormcache("spec", "include_fields", "exclude_fields", "delimeter")
+    def _get_pinguin_plan(self, spec, include_fields=(), exclude_fields=(), delimeter="/"):
+        """Validated plan of a field spec frozen by ``pinguin.freeze_spec``,
+        compiled once per model and registry."""
+        return pinguin.compile_spec(
+            self, pinguin.thaw_spec(spec), include_fields, exclude_fields, delimeter
+        )
+
     @api.model
     def search_or_create(self, vals, active_test=True):
+        self._validate_api_vals("search_or_create", vals)
+        if self._api_natural_key and all(f in vals for f in self._api_natural_key):
+            return self._search_or_create_by_natural_key(vals)
         domain = [
             (k, "=", v)
             for k, v in vals.items()
@@ -27,10 +94,43 @@ class Base(models.AbstractModel):
             records = self.create(vals)
         return (is_new, records.ids)
 
+    @api.model
+    def _search_or_create_by_natural_key(self, vals):
+        """Upsert on the unique natural key: the search uses its index, and
+        a record created by a concurrent request is returned instead of a
+        duplicate. Archived records match too, as the index includes them."""
+        records_obj = self.with_context(active_test=False)
+        domain = [(fname, "=", vals[fname]) for fname in self._api_natural_key]
+        records = records_obj.search(domain, limit=1)
+        if records:
+            return (False, records.ids)
+        try:
+            with self.env.cr.savepoint():
+                records = self.create(vals)
+        except psycopg2.IntegrityError as e:
+            if e.pgcode != errorcodes.UNIQUE_VIOLATION:
+                raise
+            records = records_obj.search(domain, limit=1)
+            if not records:
+                raise NaturalKeyConflict(
+                    "%s with natural key %s created by a concurrent transaction"
+                    % (self._name, domain)
+                )
+            return (False, records.ids)
+        return (True, records.ids)
+
     @api.model
     def search_read_nested(
-        self, domain=None, fields=None, offset=0, limit=None, order=None, delimeter="/"
+        self,
+        domain=None,
+        fields=None,
+        offset=0,
+        limit=None,
+        order=None,
+        delimeter="/",
+        included=False,
     ):
+        included_records = {} if included else None
         result = pinguin.get_dictlist_from_model(
             self._name,
             tuple(fields),
@@ -40,9 +140,144 @@ class Base(models.AbstractModel):
             order=order,
             env=self.env,
             delimeter=delimeter,
+            included=included_records,
+        )
+        if included:
+            return {"records": result, "included": included_records}
+        return result
+
+    @api.model
+    def search_read_nested_conditional(
+        self,
+        if_none_match=None,
+        domain=None,
+        fields=None,
+        offset=0,
+        limit=None,
+        order=None,
+        delimeter="/",
+        included=False,
+    ):
+        """``search_read_nested`` for polling clients: returns the ETag of the
+        result, and the records only if it differs from ``if_none_match``.
+        :returns: dict {"etag", "not_modified", "records" (and "included")}
+        """
+        included_records = {} if included else None
+        etag, result = pinguin.get_conditional_dictlist_from_model(
+            self._name,
+            tuple(fields),
+            if_none_match=if_none_match,
+            domain=domain,
+            offset=offset,
+            limit=limit,
+            order=order,
+            env=self.env,
+            delimeter=delimeter,
+            included=included_records,
+        )
+        if result is None:
+            return {"etag": etag, "not_modified": True}
+        response = {"etag": etag, "not_modified": False, "records": result}
+        if included:
+            response["included"] = included_records
+        return response
+
+    @api.model
+    def search_read_columnar(
+        self,
+        domain=None,
+        fields=None,
+        order=None,
+        delimeter="/",
+        fmt="json",
+        chunk_size=1000,
+    ):
+        result = pinguin.get_columns_from_model(
+            self._name,
+            tuple(fields),
+            fmt=fmt,
+            chunk_size=chunk_size,
+            domain=domain,
+            order=order,
+            env=self.env,
+            delimeter=delimeter,
+        )
+        return result
+
+    @api.model
+    def read_by_external_ids(self, ext_ids, fields=None, delimeter="/"):
+        """Read records registered by ``create_or_update_by_external_id``.
+        All external ids are resolved with one query and the records are
+        serialized together. Unknown external ids are omitted.
+        :returns: dict {external id: nested record dictionary}
+        """
+        ext_ids = list(ext_ids)
+        imd_rows = (
+            self.env["ir.model.data"]
+            .sudo()
+            .search_read(
+                [
+                    ("module", "=", PREFIX),
+                    ("model", "=", self._name),
+                    ("name", "in", ext_ids),
+                ],
+                ["name", "res_id"],
+            )
+        )
+        records = self.sudo().browse({row["res_id"] for row in imd_rows}).exists()
+        plan = pinguin.get_plan(self, tuple(fields or ("id",)), delim=delimeter)
+        values = dict(zip(records.ids, pinguin.get_dictlist_from_records(records, plan)))
+        return {
+            row["name"]: values[row["res_id"]]
+            for row in imd_rows
+            if row["res_id"] in values
+        }
+
+    @api.model
+    def read_group_nested(self, domain=None, groupby=None, aggregates=None, delimeter="/"):
+        result = pinguin.get_grouplist_from_model(
+            self._name,
+            tuple(groupby or ()),
+            tuple(aggregates or ()),
+            domain=domain,
+            env=self.env,
+            delimeter=delimeter,
         )
         return result
 
+    @api.model
+    def api_batch(self, operations):
+        """Run several API methods in one call and one transaction, see
+        ``lib/batch.py``. Any error rolls back every operation."""
+        return batch.run(self.env, operations)
+
+    @api.model
+    def api_job_create(self, rows, method="create_or_update_by_external_id", chunk_size=500):
+        """Import many rows in the background, see ``base.api.job``.
+        :returns: the id of the job, to follow it with ``api_job_status``
+        """
+        job = (
+            self.env["base.api.job"]
+            .sudo()
+            .create(
+                {
+                    "model": self._name,
+                    "method": method,
+                    "payload": json.dumps(rows),
+                    "chunk_size": chunk_size,
+                    "user_id": self.env.uid,
+                }
+            )
+        )
+        return job.id
+
+    @api.model
+    def api_job_status(self, job_id):
+        job = self.env["base.api.job"].sudo().browse(job_id)
+        if job.user_id != self.env.user and not self.env.is_system():
+            raise AccessError(_("You can only follow your own API jobs."))
+        return job.get_status()
+
     @api.model
     def create_or_update_by_external_id(self, vals):
         ext_id = vals.get("id")
@@ -51,6 +286,7 @@ class Base(models.AbstractModel):
         # if external id not defined
         if not isinstance(ext_id, str):
             raise ValueError('"id" field must be type of "string"')
+        self._validate_api_vals("create_or_update_by_external_id", vals)
         # if x2x fields values are exist
         fields_2many = []
 
@@ -0,0 +1,130 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import logging
+
+import psycopg2
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+TRIGGER_NAME = "base_api_change"
+TRIGGER_FUNCTION = "base_api_change_log"
+# How long a poll waits for the writers of a table to install its trigger
+TRIGGER_LOCK_TIMEOUT = "2s"
+
+
+class BaseApiChange(models.Model):
+    """Change counters of the tables read by ETags. A statement-level
+    trigger counts the writing statements of every transaction on a tracked
+    table in one row per table and transaction. The version of a table is
+    the sum of the counts of the committed transactions seen by the
+    current one: it grows when a transaction commits, whatever its
+    ``write_date``."""
+
+    _name = "base.api.change"
+    _description = "API table change counter"
+    _auto = False
+    _log_access = False
+
+    table_name = fields.Char(readonly=True)
+    weight = fields.Integer(readonly=True)
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE TABLE IF NOT EXISTS base_api_change (
+                id serial PRIMARY KEY,
+                table_name varchar NOT NULL,
+                txid bigint,
+                weight bigint NOT NULL DEFAULT 1
+            )
+            """
+        )
+        cr.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS base_api_change_table_name_txid_uniq"
+            " ON base_api_change (table_name, txid)"
+        )
+        cr.execute(
+            """
+            CREATE OR REPLACE FUNCTION %s() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO base_api_change (table_name, txid)
+                VALUES (TG_TABLE_NAME, txid_current())
+                ON CONFLICT (table_name, txid)
+                DO UPDATE SET weight = base_api_change.weight + 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+            % TRIGGER_FUNCTION
+        )
+
+    @api.model
+    def _track(self, tables):
+        """Install the trigger on the tables that miss it. Creating a trigger
+        waits for the transactions writing on the table, so it gives up
+        after ``TRIGGER_LOCK_TIMEOUT`` rather than blocking the poll behind a
+        long import.
+        :param list tables: The table names.
+        :returns: Whether every table is tracked.
+        :rtype: bool
+        """
+        cr = self.env.cr
+        cr.execute(
+            "SELECT c.relname FROM pg_trigger t"
+            " JOIN pg_class c ON c.oid = t.tgrelid"
+            " WHERE t.tgname = %s AND c.relname IN %s",
+            [TRIGGER_NAME, tuple(tables)],
+        )
+        missing = set(tables) - {row[0] for row in cr.fetchall()}
+        if not missing:
+            return True
+        try:
+            with cr.savepoint():
+                cr.execute("SET LOCAL lock_timeout = %s", [TRIGGER_LOCK_TIMEOUT])
+                for table in sorted(missing):
+                    cr.execute(
+                        'CREATE TRIGGER %s AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE'
+                        ' ON "%s" FOR EACH STATEMENT EXECUTE PROCEDURE %s()'
+                        % (TRIGGER_NAME, table, TRIGGER_FUNCTION),
+                        log_exceptions=False,
+                    )
+                cr.execute("SET LOCAL lock_timeout TO DEFAULT")
+        except (psycopg2.errors.LockNotAvailable, psycopg2.errors.DuplicateObject):
+            _logger.info("Could not track the changes of %s yet", sorted(missing))
+            return False
+        return True
+
+    @api.model
+    def _get_versions(self, tables):
+        """Versions of the content of tables, tracking them if needed.
+        :param list tables: The table names.
+        :returns: list of (table name, version), or None if some tables are
+            not tracked yet.
+        :rtype: list
+        """
+        if not self._track(tables):
+            return None
+        self.env.cr.execute(
+            "SELECT table_name, sum(weight) FROM base_api_change"
+            " WHERE table_name IN %s GROUP BY table_name",
+            [tuple(tables)],
+        )
+        versions = dict(self.env.cr.fetchall())
+        return [(table, int(versions.get(table) or 0)) for table in tables]
+
+    @api.model
+    def _compact(self):
+        """Merge the rows of the committed transactions into one row per
+        table. The rows of the transactions still running are not visible,
+        so they are kept and the versions do not change."""
+        self.env.cr.execute(
+            """
+            WITH deleted AS (
+                DELETE FROM base_api_change RETURNING table_name, weight
+            )
+            INSERT INTO base_api_change (table_name, weight)
+            SELECT table_name, sum(weight) FROM deleted GROUP BY table_name
+            """
+        )
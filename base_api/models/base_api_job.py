@@ -0,0 +1,251 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import base64
+import json
+import logging
+import time
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Methods of ``Base`` that a job can run, one call per row
+JOB_METHODS = [
+    ("create_or_update_by_external_id", "create_or_update_by_external_id"),
+    ("search_or_create", "search_or_create"),
+]
+
+
+class BaseApiJob(models.Model):
+    """Large imports run in the background by chunks: every chunk is
+    committed, so locks are held for one chunk only and a bad row does not
+    roll back the rows imported before it."""
+
+    _name = "base.api.job"
+    _description = "API import job"
+    _order = "id desc"
+
+    name = fields.Char(required=True, default="API import")
+    model = fields.Char(required=True)
+    method = fields.Selection(
+        JOB_METHODS, required=True, default="create_or_update_by_external_id"
+    )
+    payload = fields.Text(
+        help="JSON list of the values of the rows, stored one JSON object per "
+        "line when the job starts"
+    )
+    payload_offset = fields.Integer(
+        readonly=True, help="Position in the payload of the next row to process"
+    )
+    attachment_id = fields.Many2one(
+        "ir.attachment",
+        help="File with the rows when there is no payload: a JSON list, or "
+        "one JSON object per line",
+    )
+    user_id = fields.Many2one(
+        "res.users", required=True, default=lambda self: self.env.user
+    )
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        required=True,
+        default="pending",
+        index=True,
+    )
+    chunk_size = fields.Integer(default=500)
+    total_count = fields.Integer(readonly=True)
+    processed_count = fields.Integer(readonly=True)
+    failed_count = fields.Integer(readonly=True)
+    progress = fields.Float(compute="_compute_progress")
+    rows_per_second = fields.Float(readonly=True)
+    date_start = fields.Datetime(readonly=True)
+    date_end = fields.Datetime(readonly=True)
+    error = fields.Text(readonly=True)
+    error_ids = fields.One2many("base.api.job.error", "job_id", readonly=True)
+
+    @api.depends("total_count", "processed_count")
+    def _compute_progress(self):
+        for job in self:
+            job.progress = job.total_count and 100.0 * job.processed_count / job.total_count
+
+    @api.constrains("model", "method")
+    def _check_model_method(self):
+        for job in self:
+            if job.model not in self.env:
+                raise ValidationError(_("Unknown model %s") % job.model)
+            if not callable(getattr(self.env[job.model], job.method, None)):
+                raise ValidationError(
+                    _("Model %s has no method %s") % (job.model, job.method)
+                )
+
+    def _load_rows(self):
+        self.ensure_one()
+        if self.payload:
+            return json.loads(self.payload)
+        content = base64.b64decode(self.attachment_id.datas or b"").decode("utf-8")
+        if content.lstrip().startswith("["):
+            return json.loads(content)
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def _process_rows(self, rows, first_index):
+        """Run the rows of a chunk in one savepoint. If one of them fails,
+        the chunk is run again row by row to record the failing rows.
+        :returns: list of (row index, values, error message)
+        """
+        self.ensure_one()
+        records_obj = self.env[self.model].with_user(self.user_id)
+        method = getattr(records_obj, self.method)
+        try:
+            with self.env.cr.savepoint():
+                for vals in rows:
+                    method(dict(vals))
+            return []
+        except Exception:
+            _logger.debug("Chunk of job %s failed, retrying row by row", self.id)
+        errors = []
+        for index, vals in enumerate(rows, first_index):
+            try:
+                with self.env.cr.savepoint():
+                    method(dict(vals))
+            except Exception as e:
+                errors.append((index, vals, str(e)))
+        return errors
+
+    def run(self, commit=True):
+        """Process the jobs, committing after every chunk when ``commit``.
+        A job stopped in the middle (e.g. by a restart) resumes after its
+        last committed chunk. A job that raises is marked as failed with the
+        error and the next jobs still run."""
+        for job in self:
+            try:
+                job._run(commit)
+            except Exception as e:
+                _logger.exception("API job %s failed", job.id)
+                job.write(
+                    {
+                        "state": "failed",
+                        "error": str(e),
+                        "date_end": fields.Datetime.now(),
+                    }
+                )
+                if commit:
+                    self.env.cr.commit()
+
+    def _prepare(self):
+        """Parse the rows once and store them one JSON object per line, so
+        that the next runs read them from ``payload_offset``."""
+        self.ensure_one()
+        rows = self._load_rows()
+        if not isinstance(rows, list):
+            raise ValueError("The rows of the job must be a JSON list")
+        self.write(
+            {
+                "state": "running",
+                "payload": "\n".join(json.dumps(row) for row in rows),
+                "payload_offset": 0,
+                "total_count": len(rows),
+                "date_start": fields.Datetime.now(),
+            }
+        )
+
+    def _iter_chunks(self):
+        """Chunks of the rows after ``payload_offset``: only these rows are
+        parsed.
+        :returns: iterator of (offset after the chunk, list of rows)
+        """
+        self.ensure_one()
+        payload = self.payload or ""
+        offset, chunk_size = self.payload_offset, max(1, self.chunk_size)
+        while offset < len(payload):
+            rows = []
+            while offset < len(payload) and len(rows) < chunk_size:
+                end = payload.find("\n", offset)
+                if end < 0:
+                    end = len(payload)
+                rows.append(json.loads(payload[offset:end]))
+                offset = end + 1
+            yield offset, rows
+
+    def _run(self, commit):
+        self.ensure_one()
+        # every step is undone by its savepoint if it raises, so the job can
+        # be marked as failed on the same cursor
+        if self.state == "pending":
+            with self.env.cr.savepoint():
+                self._prepare()
+            if commit:
+                self.env.cr.commit()
+        start = time.time()
+        resumed_at = self.processed_count
+        for offset, rows in self._iter_chunks():
+            with self.env.cr.savepoint():
+                errors = self._process_rows(rows, self.processed_count)
+                position = self.processed_count + len(rows)
+                elapsed = time.time() - start
+                self.write(
+                    {
+                        "payload_offset": offset,
+                        "processed_count": position,
+                        "failed_count": self.failed_count + len(errors),
+                        "rows_per_second": (position - resumed_at) / (elapsed or 1),
+                        "error_ids": [
+                            (
+                                0,
+                                0,
+                                {
+                                    "row_index": index,
+                                    "values": json.dumps(vals),
+                                    "message": message,
+                                },
+                            )
+                            for index, vals, message in errors
+                        ],
+                    }
+                )
+            _logger.info(
+                "API job %s: %d/%d rows, %d failed (%.0f rows/s)",
+                self.id,
+                position,
+                self.total_count,
+                self.failed_count,
+                self.rows_per_second,
+            )
+            if commit:
+                self.env.cr.commit()
+        self.write({"state": "done", "date_end": fields.Datetime.now()})
+        if commit:
+            self.env.cr.commit()
+
+    def get_status(self):
+        self.ensure_one()
+        return {
+            "state": self.state,
+            "total": self.total_count,
+            "processed": self.processed_count,
+            "failed": self.failed_count,
+            "progress": self.progress,
+            "rows_per_second": self.rows_per_second,
+            "errors": [
+                {"row": error.row_index, "message": error.message}
+                for error in self.error_ids
+            ],
+        }
+
+    @api.model
+    def _cron_process(self):
+        self.search([("state", "in", ("pending", "running"))], order="id").run()
+
+
+class BaseApiJobError(models.Model):
+    _name = "base.api.job.error"
+    _description = "API import job error"
+    _order = "row_index"
+
+    job_id = fields.Many2one("base.api.job", required=True, ondelete="cascade", index=True)
+    row_index = fields.Integer()
+    values = fields.Text()
+    message = fields.Text()
@@ -1,3 +1,9 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html)
 
+from . import test_api_job
 from . import test_base
+from . import test_compression
+from . import test_import_time
+from . import test_natural_key
+from . import test_pinguin
+from . import test_validation
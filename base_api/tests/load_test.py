@@ -0,0 +1,285 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+"""Load test of the base_api methods through XML-RPC.
+
+Not part of the test suite: run it against a server started with workers,
+so that requests really run concurrently, e.g.::
+
+    python3 base_api/tests/load_test.py --db loadtest --processes 16 \\
+        --duration 60 --mix search_read_nested=6,search_or_create=2 \\
+        --start-odoo /path/to/odoo-bin --addons-path /path/to/addons
+
+Every process logs in once and calls random operations of the mix until the
+end of the run. The report gives, per operation and in total, the
+throughput, the p50/p95/p99 latencies, the rate of errors and of
+serialization failures, and the partners created twice by concurrent
+``search_or_create`` calls on the same values.
+"""
+import argparse
+import collections
+import json
+import math
+import multiprocessing
+import random
+import subprocess
+import sys
+import time
+import xmlrpc.client
+
+OPERATIONS = (
+    "search_read_nested",
+    "search_or_create",
+    "create_or_update_by_external_id",
+)
+DEFAULT_MIX = "search_read_nested=6,search_or_create=2,create_or_update_by_external_id=2"
+NESTED_FIELDS = ["name", "email", "company_id/name", "country_id/code", "category_id/name"]
+# Errors of concurrent transactions, retried by Odoo or reported to the client
+SERIALIZATION_ERRORS = (
+    "could not serialize access",
+    "SerializationFailure",
+    "concurrent update",
+    "deadlock detected",
+)
+
+
+def parse_mix(mix):
+    """Parse ``operation=weight,...`` into a dict."""
+    weights = {}
+    for item in mix.split(","):
+        operation, __, weight = item.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError("Unknown operation: %s" % operation)
+        weights[operation] = float(weight or 1)
+    return weights
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = math.ceil(q / 100.0 * len(values)) - 1
+    return values[max(0, min(len(values) - 1, index))]
+
+
+class Client(object):
+    def __init__(self, url, db, login, password):
+        self.db, self.password = db, password
+        common = xmlrpc.client.ServerProxy("%s/xmlrpc/2/common" % url, allow_none=True)
+        self.uid = common.authenticate(db, login, password, {})
+        if not self.uid:
+            raise RuntimeError("Authentication failed for %s" % login)
+        self.models = xmlrpc.client.ServerProxy("%s/xmlrpc/2/object" % url, allow_none=True)
+
+    def call(self, model, method, *args, **kwargs):
+        return self.models.execute_kw(
+            self.db, self.uid, self.password, model, method, list(args), kwargs
+        )
+
+
+def wait_for_server(url, timeout=120):
+    common = xmlrpc.client.ServerProxy("%s/xmlrpc/2/common" % url)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return common.version()
+        except (OSError, xmlrpc.client.ProtocolError):
+            if time.time() > deadline:
+                raise
+            time.sleep(1)
+
+
+def start_odoo(args):
+    """Initialize the database with base_api and start a server with one
+    worker per load process."""
+    command = [args.start_odoo, "-d", args.db, "--http-port", str(args.port)]
+    if args.addons_path:
+        command += ["--addons-path", args.addons_path]
+    subprocess.run(
+        command + ["-i", "base_api", "--without-demo=all", "--stop-after-init"],
+        check=True,
+    )
+    server = subprocess.Popen(command + ["--workers", str(max(2, args.processes))])
+    wait_for_server(args.url)
+    return server
+
+
+def seed(client, args):
+    """Create the partners read by ``search_read_nested``, 100 per request."""
+    for start in range(0, args.seed, 100):
+        operations = [
+            {
+                "model": "res.partner",
+                "method": "create_or_update_by_external_id",
+                "args": [{"id": "%s.seed_%d" % (args.prefix, index), "name": "%s Seed %d" % (args.prefix, index)}],
+            }
+            for index in range(start, min(start + 100, args.seed))
+        ]
+        client.call("res.partner", "api_batch", operations)
+
+
+def run_operation(client, operation, rng, args):
+    key = rng.randrange(args.key_space)
+    if operation == "search_read_nested":
+        return client.call(
+            "res.partner",
+            "search_read_nested",
+            domain=[("name", "=like", "%s Seed %d%%" % (args.prefix, rng.randrange(100)))],
+            fields=NESTED_FIELDS,
+            limit=80,
+        )
+    if operation == "search_or_create":
+        return client.call(
+            "res.partner", "search_or_create", {"name": "%s Key %d" % (args.prefix, key)}
+        )
+    return client.call(
+        "res.partner",
+        "create_or_update_by_external_id",
+        {"id": "%s.key_%d" % (args.prefix, key), "name": "%s Ext %d" % (args.prefix, key)},
+    )
+
+
+def worker(index, args, weights, start_at):
+    """Run random operations until the end of the run.
+    :returns: {operation: {"latencies": [seconds], "errors": n, "serialization": n}}
+    """
+    rng = random.Random(args.random_seed + index)
+    client = Client(args.url, args.db, args.login, args.password)
+    operations, cum_weights = list(weights), []
+    for operation in operations:
+        cum_weights.append((cum_weights[-1] if cum_weights else 0) + weights[operation])
+    stats = {op: {"latencies": [], "errors": 0, "serialization": 0} for op in operations}
+    while time.time() < start_at:
+        time.sleep(0.01)
+    deadline = start_at + args.duration
+    while time.time() < deadline:
+        operation = rng.choices(operations, cum_weights=cum_weights)[0]
+        start = time.perf_counter()
+        try:
+            run_operation(client, operation, rng, args)
+        except xmlrpc.client.Fault as e:
+            message = e.faultString
+            if any(error in message for error in SERIALIZATION_ERRORS):
+                stats[operation]["serialization"] += 1
+            else:
+                stats[operation]["errors"] += 1
+            continue
+        except (OSError, xmlrpc.client.ProtocolError):
+            stats[operation]["errors"] += 1
+            continue
+        stats[operation]["latencies"].append(time.perf_counter() - start)
+    return stats
+
+
+def count_duplicates(client, args):
+    """Number of extra partners created for the same ``search_or_create`` values."""
+    groups = client.call(
+        "res.partner",
+        "read_group",
+        [("name", "=like", "%s Key %%" % args.prefix)],
+        ["name"],
+        ["name"],
+        lazy=False,
+    )
+    return sum(group["__count"] - 1 for group in groups)
+
+
+def build_report(results, duration, duplicates):
+    merged = collections.defaultdict(lambda: {"latencies": [], "errors": 0, "serialization": 0})
+    for stats in results:
+        for operation, values in stats.items():
+            for target in (merged[operation], merged["total"]):
+                target["latencies"].extend(values["latencies"])
+                target["errors"] += values["errors"]
+                target["serialization"] += values["serialization"]
+    report = {"duration": duration, "duplicates": duplicates, "operations": {}}
+    for operation, values in merged.items():
+        latencies = sorted(values["latencies"])
+        calls = len(latencies) + values["errors"] + values["serialization"]
+        report["operations"][operation] = {
+            "calls": calls,
+            "throughput": len(latencies) / duration,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "error_rate": values["errors"] / (calls or 1),
+            "serialization_rate": values["serialization"] / (calls or 1),
+        }
+    return report
+
+
+def print_report(report):
+    header = "%-32s %8s %10s %9s %9s %9s %8s %8s"
+    print(header % ("operation", "calls", "ops/s", "p50 ms", "p95 ms", "p99 ms", "errors", "serial."))
+    for operation, values in sorted(report["operations"].items(), key=lambda item: item[0] == "total"):
+        print(
+            "%-32s %8d %10.1f %9.1f %9.1f %9.1f %7.2f%% %7.2f%%"
+            % (
+                operation,
+                values["calls"],
+                values["throughput"],
+                values["p50_ms"],
+                values["p95_ms"],
+                values["p99_ms"],
+                values["error_rate"] * 100,
+                values["serialization_rate"] * 100,
+            )
+        )
+    print("duplicates created by search_or_create: %d" % report["duplicates"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--url",
+        help="default: http://localhost:<port>, the server started by --start-odoo",
+    )
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--login", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument(
+        "--key-space",
+        type=int,
+        default=100,
+        help="distinct values written, smaller values cause more conflicts",
+    )
+    parser.add_argument("--seed", type=int, default=1000, help="partners created before the run")
+    parser.add_argument("--prefix", default="LoadTest", help="name of the test records")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--start-odoo", metavar="ODOO_BIN", help="start a local server")
+    parser.add_argument("--addons-path")
+    parser.add_argument("--port", type=int, default=8069)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.start_odoo or not args.url:
+        args.url = "http://localhost:%d" % args.port
+
+    server = start_odoo(args) if args.start_odoo else None
+    try:
+        client = Client(args.url, args.db, args.login, args.password)
+        if args.seed:
+            seed(client, args)
+        duplicates_before = count_duplicates(client, args)
+        start_at = time.time() + 2
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.starmap(
+                worker,
+                [(index, args, args.mix, start_at) for index in range(args.processes)],
+            )
+        duplicates = count_duplicates(client, args) - duplicates_before
+        report = build_report(results, args.duration, duplicates)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
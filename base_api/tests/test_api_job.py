@@ -0,0 +1,99 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import json
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged("post_install", "at_install")
+class TestApiJob(TransactionCase):
+    def test_api_job(self):
+        partner_obj = self.env["res.partner"]
+        rows = [{"id": "ext.job_%s" % i, "name": "TestJob%s" % i} for i in range(5)]
+        rows[3]["no_such_field"] = True
+        job_id = partner_obj.api_job_create(rows, chunk_size=2)
+        job = self.env["base.api.job"].browse(job_id)
+        self.assertEqual(job.state, "pending")
+        # the chunks are not committed in tests
+        job.run(commit=False)
+        status = partner_obj.api_job_status(job_id)
+        # (1) every row was processed by chunks
+        # (2) the bad row is recorded and does not roll back the other rows
+        self.assertEqual(status["state"], "done")
+        self.assertEqual((status["total"], status["processed"]), (5, 5))
+        self.assertEqual(status["failed"], 1)
+        self.assertEqual([error["row"] for error in status["errors"]], [3])
+        imported = partner_obj.read_by_external_ids([row["id"] for row in rows], ["name"])
+        self.assertEqual(
+            sorted(imported), ["ext.job_0", "ext.job_1", "ext.job_2", "ext.job_4"]
+        )
+        # (3) a job resumes after its last processed row
+        job.write({"state": "running"})
+        job.run(commit=False)
+        self.assertEqual(job.failed_count, 1)
+
+    def test_api_job_invalid_payload(self):
+        job = self.env["base.api.job"].create(
+            {"model": "res.partner", "payload": '{"id": "ext.job"}'}
+        )
+        job.run(commit=False)
+        self.assertEqual(job.state, "failed")
+
+    def test_api_job_unknown_model(self):
+        job_obj = self.env["base.api.job"]
+        # (1) a job on an unknown model is not created
+        with self.assertRaises(ValidationError):
+            job_obj.create({"model": "no.such.model", "payload": "[]"})
+        # (2) a job whose model is gone fails alone, the next job still runs
+        t_jobs = job_obj.create(
+            [
+                {
+                    "model": "res.partner",
+                    "payload": json.dumps([{"id": "ext.job_gone", "name": "TestJob"}]),
+                },
+                {
+                    "model": "res.partner",
+                    "payload": json.dumps([{"id": "ext.job_next", "name": "TestJob"}]),
+                },
+            ]
+        )
+        self.env.cr.execute(
+            "UPDATE base_api_job SET model = 'no.such.model' WHERE id = %s",
+            [t_jobs[0].id],
+        )
+        t_jobs.invalidate_cache()
+        t_jobs.run(commit=False)
+        self.assertEqual(t_jobs.mapped("state"), ["failed", "done"])
+        self.assertIn("no.such.model", t_jobs[0].error)
+
+    def test_api_job_resume_parses_once(self):
+        rows = [{"id": "ext.job_%s" % i, "name": "TestJob%s" % i} for i in range(5)]
+        job = self.env["base.api.job"].browse(
+            self.env["res.partner"].api_job_create(rows, chunk_size=2)
+        )
+        job_cls = type(job)
+        with patch.object(
+            job_cls,
+            "_process_rows",
+            autospec=True,
+            side_effect=[[], RuntimeError("Worker killed")],
+        ):
+            job.run(commit=False)
+        # (1) an exception in a chunk fails the job and rolls back the chunk
+        # (2) the rows before it stay processed
+        self.assertEqual(job.state, "failed")
+        self.assertEqual(job.error, "Worker killed")
+        self.assertEqual(job.processed_count, 2)
+        # (3) the rows are stored one per line and the job resumes from the
+        # offset of its next row without parsing the rows before it
+        self.assertEqual(job.payload.splitlines()[2], json.dumps(rows[2]))
+        job.write({"state": "running"})
+        with patch.object(json, "loads", wraps=json.loads) as loads:
+            job.run(commit=False)
+        parsed = [call.args[0] for call in loads.call_args_list]
+        for row in rows[:2]:
+            self.assertNotIn(json.dumps(row), parsed)
+        self.assertNotIn(job.payload, parsed)
+        self.assertEqual((job.state, job.processed_count), ("done", 5))
@@ -1,9 +1,13 @@
 # Copyright 2019 Ivan Yelizariev <https://it-projects.info/team/yelizariev>
 # Copyright 2019 Anvar Kildebekov <https://it-projects.info/team/fedoranvar>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+from werkzeug.exceptions import BadRequest
+
 from odoo.tests import tagged
 from odoo.tests.common import TransactionCase
 
+from ..lib import pinguin
+
 prefix = "__base_api__."
 
 
@@ -163,6 +167,204 @@ class TestBase(TransactionCase):
         t_country_1.unlink()
         t_country_2.unlink()
 
+    def test_read_by_external_ids(self):
+        partner_obj = self.env["res.partner"]
+        t_company = self.env["res.company"].create({"name": "TestReadExtCompany"})
+        for ext_id in ("ext.read_1", "ext.read_2"):
+            partner_obj.create_or_update_by_external_id(
+                {"id": ext_id, "name": ext_id, "company_id": t_company.id}
+            )
+        result = partner_obj.read_by_external_ids(
+            ["ext.read_1", "ext.read_2", "ext.read_missing"],
+            ["name", "company_id/name"],
+        )
+        # (1) unknown external ids are omitted
+        # (2) records are serialized with nested fields
+        self.assertEqual(set(result), {"ext.read_1", "ext.read_2"})
+        self.assertEqual(result["ext.read_2"]["name"], "ext.read_2")
+        self.assertEqual(
+            result["ext.read_1"]["company_id"]["name"], "TestReadExtCompany"
+        )
+
+    def test_api_batch(self):
+        partner_obj = self.env["res.partner"]
+        operations = [
+            {
+                "model": "res.partner",
+                "method": "search_or_create",
+                "args": [{"name": "TestBatchParent"}],
+            },
+            {
+                "model": "res.partner",
+                "method": "create_or_update_by_external_id",
+                "args": [
+                    {
+                        "id": "ext.batch_child",
+                        "name": "TestBatchChild",
+                        "parent_id": {"$ref": [0, 1, 0]},
+                    }
+                ],
+            },
+            {
+                "model": "res.partner",
+                "method": "read_by_external_ids",
+                "args": [["ext.batch_child"], ["name", "parent_id/name"]],
+            },
+        ]
+        results = partner_obj.api_batch(operations)
+        # (1) every step returns its result
+        # (2) the ids returned by a step are used by the next steps
+        self.assertEqual(len(results), 3)
+        self.assertTrue(results[0][0])
+        t_child = partner_obj.search([("name", "=", "TestBatchChild")])
+        self.assertEqual(results[1][1], t_child.id)
+        self.assertEqual(
+            results[2]["ext.batch_child"]["parent_id"]["name"], "TestBatchParent"
+        )
+        # (3) invalid methods and references are refused
+        for operation in [
+            {"model": "res.partner", "method": "unlink", "args": []},
+            {
+                "model": "res.partner",
+                "method": "search_or_create",
+                "args": [{"$ref": [5]}],
+            },
+        ]:
+            with self.assertRaises(ValueError):
+                partner_obj.api_batch([operation])
+
+    def test_search_read_nested_conditional(self):
+        partner_obj = self.env["res.partner"]
+        t_partner = partner_obj.create(
+            {"name": "TestConditional", "company_id": self.env.company.id}
+        )
+        kwargs = {
+            "domain": [("id", "=", t_partner.id)],
+            "fields": ["name", "company_id/name"],
+        }
+        result = partner_obj.search_read_nested_conditional(**kwargs)
+        etag = result["etag"]
+        # (1) the records are returned with the ETag of the result
+        # (2) an unchanged result is not serialized again
+        self.assertTrue(etag)
+        self.assertFalse(result["not_modified"])
+        self.assertEqual(result["records"][0]["name"], "TestConditional")
+        result = partner_obj.search_read_nested_conditional(if_none_match=etag, **kwargs)
+        self.assertTrue(result["not_modified"])
+        self.assertNotIn("records", result)
+        # (3) writes on the models read by the spec change the ETag
+        for record in (t_partner, self.env.company):
+            record.write({"name": record.name + " Changed"})
+            result = partner_obj.search_read_nested_conditional(
+                if_none_match=etag, **kwargs
+            )
+            self.assertFalse(result["not_modified"])
+            self.assertNotEqual(result["etag"], etag)
+            etag = result["etag"]
+        # (4) so does a write committed with an older write_date, like the
+        # one of an import that started before the last poll
+        self.env.cr.execute(
+            "UPDATE res_partner SET name = 'TestConditional Old',"
+            " write_date = write_date - interval '1 hour' WHERE id = %s",
+            [t_partner.id],
+        )
+        t_partner.invalidate_cache()
+        result = partner_obj.search_read_nested_conditional(if_none_match=etag, **kwargs)
+        self.assertFalse(result["not_modified"])
+        self.assertEqual(result["records"][0]["name"], "TestConditional Old")
+        # (5) and writes on the models followed by the domain
+        kwargs = {
+            "domain": [("id", "=", t_partner.id), ("company_id.name", "!=", False)],
+            "fields": ["name"],
+        }
+        etag = partner_obj.search_read_nested_conditional(**kwargs)["etag"]
+        self.env.company.write({"name": self.env.company.name + " Again"})
+        result = partner_obj.search_read_nested_conditional(if_none_match=etag, **kwargs)
+        self.assertFalse(result["not_modified"])
+        # (6) and the dependencies of non-stored fields: the name of a user
+        # is read from its partner
+        users_obj = self.env["res.users"]
+        plan = pinguin.get_plan(users_obj, ("name",))
+        models, dummy = pinguin.get_read_dependencies(users_obj, plan)
+        self.assertIn("res.partner", models)
+
+    def test_change_versions(self):
+        change_obj = self.env["base.api.change"]
+        tables = ["res_partner", "res_country"]
+        versions = dict(change_obj._get_versions(tables))
+        # (1) the tables are tracked by the trigger
+        # (2) every writing statement increases the version of its table
+        self.env.cr.execute(
+            "SELECT count(*) FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid"
+            " WHERE t.tgname = 'base_api_change' AND c.relname IN %s",
+            [tuple(tables)],
+        )
+        self.assertEqual(self.env.cr.fetchone()[0], 2)
+        self.env.cr.execute("UPDATE res_partner SET color = color WHERE id = 0")
+        self.env.cr.execute("UPDATE res_partner SET color = color WHERE id = 0")
+        changed = dict(change_obj._get_versions(tables))
+        self.assertEqual(changed["res_partner"], versions["res_partner"] + 2)
+        self.assertEqual(changed["res_country"], versions["res_country"])
+        # (3) compacting the rows keeps the versions
+        change_obj._compact()
+        self.assertEqual(dict(change_obj._get_versions(tables)), changed)
+        self.env.cr.execute(
+            "SELECT count(*) FROM base_api_change WHERE table_name = 'res_partner'"
+        )
+        self.assertEqual(self.env.cr.fetchone()[0], 1)
+
+    def test_read_group_nested(self):
+        partner_obj = self.env["res.partner"]
+        country = self.env.ref("base.be")
+        t_parents = partner_obj.create(
+            [
+                {"name": "TestGroupParent1", "country_id": country.id},
+                {"name": "TestGroupParent2", "country_id": country.id},
+            ]
+        )
+        partner_obj.create(
+            [
+                {"name": "TestGroupChild", "parent_id": parent.id, "color": color}
+                for parent, color in zip(t_parents + t_parents[0], (1, 2, 4))
+            ]
+        )
+        domain = [("name", "=", "TestGroupChild")]
+        #
+        # Test #1: children grouped by the country of their parent
+        #
+        result = partner_obj.read_group_nested(
+            domain=domain,
+            groupby=["parent_id/country_id"],
+            aggregates=["color:sum", "color:max"],
+        )
+        # (1) groups of both parents are merged in one group
+        # (2) the aggregates are merged across these groups
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["parent_id/country_id"], country.id)
+        self.assertEqual(result[0]["__count"], 3)
+        self.assertEqual(result[0]["color:sum"], 7)
+        self.assertEqual(result[0]["color:max"], 4)
+        #
+        # Test #2: custom delimeter and plain fields
+        #
+        result = partner_obj.read_group_nested(
+            domain=domain, groupby=["parent_id.name", "parent_id"], delimeter="."
+        )
+        self.assertEqual(
+            sorted((row["parent_id.name"], row["__count"]) for row in result),
+            [("TestGroupParent1", 2), ("TestGroupParent2", 1)],
+        )
+        #
+        # Test #3: invalid paths and aggregates
+        #
+        for groupby, aggregates in [
+            (["child_ids/name"], []),
+            (["unknown_field"], []),
+            (["parent_id"], ["color:avg"]),
+        ]:
+            with self.assertRaises(BadRequest):
+                partner_obj.read_group_nested(groupby=groupby, aggregates=aggregates)
+
     def test_create_or_update_by_external_id(self):
         partner_obj = self.env["res.partner"]
         company_obj = self.env["res.company"]
@@ -0,0 +1,63 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import gzip
+import json
+import logging
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..lib import compression, pinguin
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("post_install", "at_install")
+class TestCompression(TransactionCase):
+    def test_negotiate_encoding(self):
+        # (1) the client preference wins over the server preference
+        # (2) refused and unknown encodings are not used
+        self.assertEqual(compression.negotiate_encoding("gzip;q=1, br;q=0.5"), "gzip")
+        self.assertEqual(compression.negotiate_encoding("gzip"), "gzip")
+        self.assertIsNone(compression.negotiate_encoding("gzip;q=0"))
+        self.assertIsNone(compression.negotiate_encoding("identity"))
+        self.assertIsNone(compression.negotiate_encoding(None))
+
+    def test_make_response(self):
+        body = json.dumps([{"name": "Partner %s" % i} for i in range(1000)])
+        response = pinguin.make_response(body, accept_encoding="gzip")
+        # (1) large bodies are compressed
+        # (2) small bodies are sent as they are
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.get_data()), body.encode())
+        response = pinguin.make_response("{}", accept_encoding="gzip")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        # (3) streamed bodies are compressed chunk by chunk
+        chunks = pinguin.iter_json_list(({"id": i} for i in range(5000)), 1024)
+        response = pinguin.make_response(chunks, accept_encoding="gzip")
+        data = gzip.decompress(b"".join(response.response))
+        self.assertEqual(json.loads(data)[-1], {"id": 4999})
+
+    def test_compression_benchmark(self):
+        partner_obj = self.env["res.partner"]
+        records = partner_obj.search_read_nested(
+            fields=["name", "email", "company_id/name", "country_id/name"]
+        )
+        payload = json.dumps(records * max(1, 2000 // (len(records) or 1)))
+        results = compression.benchmark(payload)
+        for row in results:
+            _logger.info(
+                "%s level %s: %d -> %d bytes (%.1f%%), %.2f ms, %.0f MB/s",
+                row["encoding"],
+                row["level"],
+                len(payload),
+                row["size"],
+                row["ratio"] * 100,
+                row["ms"],
+                row["mb_per_s"],
+            )
+        # (1) every available encoding and level is measured
+        # (2) and saves bytes on nested JSON
+        self.assertTrue(any(row["encoding"] == "gzip" for row in results))
+        for row in results:
+            self.assertLess(row["ratio"], 1)
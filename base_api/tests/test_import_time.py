@@ -0,0 +1,64 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import logging
+import os
+import subprocess
+import sys
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+_logger = logging.getLogger(__name__)
+
+# Packages of the API layer that must not be loaded with the registry.
+# werkzeug, psycopg2 and six are not listed: odoo core loads them anyway.
+DEFERRED_MODULES = (
+    "bravado_core",
+    "brotli",
+    "jsonschema",
+    "simplejson",
+    "zstandard",
+)
+PINGUIN = "odoo.addons.base_api.lib.pinguin"
+
+
+@tagged("post_install", "at_install")
+class TestImportTime(BaseCase):
+    def _import_times(self, module):
+        """Import ``module`` in a fresh interpreter with ``-X importtime``
+        and return {module name: (self, cumulative microseconds)}."""
+        addons_path = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        code = "import odoo.addons; odoo.addons.__path__.append({!r}); import {}".format(
+            addons_path, module
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        times = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_time, cumulative, name = line.split(":", 1)[1].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = (int(self_time), int(cumulative))
+        return times
+
+    def test_pinguin_defers_api_dependencies(self):
+        times = self._import_times(PINGUIN)
+        self.assertIn(PINGUIN, times)
+        # the self time is the cost of pinguin itself; the cumulative time
+        # also counts the modules it is the first to import, e.g. odoo.http
+        _logger.info(
+            "pinguin import: %d us self, %d us cumulative",
+            *times[PINGUIN]
+        )
+        for module in DEFERRED_MODULES:
+            loaded = [name for name in times if name.split(".")[0] == module]
+            # (1) the heavy API dependencies are not loaded at import time
+            self.assertFalse(loaded, "%s imported with base_api" % module)
@@ -0,0 +1,100 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import threading
+from unittest.mock import patch
+
+from psycopg2 import OperationalError, errorcodes
+
+from odoo import SUPERUSER_ID, api
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+# not an ISO country code, res.country has a unique index on code
+TEST_CODE = "QZ"
+WORKERS = 8
+MAX_TRIES = 5
+
+
+@tagged("post_install", "at_install")
+class TestNaturalKey(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        country_class = type(self.env["res.country"])
+        patcher = patch.object(country_class, "_api_natural_key", ("code",))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_or_create_by_natural_key(self):
+        country_obj = self.env["res.country"]
+        vals = {"code": TEST_CODE, "name": "TestNaturalKey"}
+        is_new, record_ids = country_obj.search_or_create(vals)
+        # (1) the record is created once
+        # (2) the other values are not part of the search
+        self.assertTrue(is_new)
+        is_new, record_ids2 = country_obj.search_or_create(
+            dict(vals, name="TestNaturalKey Renamed")
+        )
+        self.assertFalse(is_new)
+        self.assertEqual(record_ids, record_ids2)
+
+    def test_natural_key_index(self):
+        # res.partner.industry has no unique constraint of its own
+        industry_class = type(self.env["res.partner.industry"])
+        with patch.object(industry_class, "_api_natural_key", ("name",)):
+            self.env["res.partner.industry"]._auto_init()
+        self.env.cr.execute(
+            """
+            SELECT i.indisunique
+              FROM pg_index i
+              JOIN pg_class c ON c.oid = i.indexrelid
+             WHERE c.relname = %s
+            """,
+            ["res_partner_industry_api_natural_key_uniq"],
+        )
+        # (1) the unique index of the natural key is created with the table
+        self.assertEqual(self.env.cr.fetchall(), [(True,)])
+
+    def _upsert_in_new_cursor(self, barrier, results):
+        """search_or_create in its own transaction, retried on serialization
+        failures as the RPC dispatcher does."""
+        vals = {"code": TEST_CODE, "name": "TestNaturalKey Concurrent"}
+        with api.Environment.manage():
+            barrier.wait()
+            for _try in range(MAX_TRIES):
+                try:
+                    with self.registry.cursor() as cr:
+                        env = api.Environment(cr, SUPERUSER_ID, {})
+                        result = env["res.country"].search_or_create(dict(vals))
+                    results.append(result)
+                    return
+                except OperationalError as e:
+                    if e.pgcode != errorcodes.SERIALIZATION_FAILURE:
+                        results.append(e)
+                        return
+            results.append(RuntimeError("too many serialization failures"))
+
+    def test_concurrent_search_or_create(self):
+        barrier = threading.Barrier(WORKERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._upsert_in_new_cursor, args=(barrier, results))
+            for i in range(WORKERS)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with self.registry.cursor() as cr:
+                cr.execute("SELECT id FROM res_country WHERE code = %s", [TEST_CODE])
+                created_ids = [row[0] for row in cr.fetchall()]
+        finally:
+            with self.registry.cursor() as cr:
+                cr.execute("DELETE FROM res_country WHERE code = %s", [TEST_CODE])
+        errors = [result for result in results if isinstance(result, Exception)]
+        # (1) every worker got a result
+        # (2) one record was created, the other workers found it
+        self.assertFalse(errors)
+        self.assertEqual(len(results), WORKERS)
+        self.assertEqual(len(created_ids), 1)
+        self.assertEqual(sum(1 for is_new, ids in results if is_new), 1)
+        self.assertEqual({ids[0] for is_new, ids in results}, set(created_ids))
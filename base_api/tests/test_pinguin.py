@@ -0,0 +1,177 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import base64
+
+from werkzeug.exceptions import BadRequest
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..lib import pinguin
+
+
+@tagged("post_install", "at_install")
+class TestPinguin(TransactionCase):
+    def test_invalid_spec(self):
+        partner_obj = self.env["res.partner"]
+        invalid_specs = [
+            ("name", "no_such_field"),
+            ("name", ("email", ("id",))),
+            ("name", ("company_id", "name")),
+            ("name", ("category_id", ("name",))),
+            ("name", 42),
+            ("name", "company_id/no_such_field"),
+        ]
+        for spec in invalid_specs:
+            # (1) the spec is rejected before any record is serialized
+            # (2) with a structured 4xx response
+            with self.assertRaises(BadRequest) as error:
+                pinguin.get_dictlist_from_model(
+                    "res.partner", spec, env=self.env, domain=[("id", "=", 0)]
+                )
+            self.assertEqual(error.exception.response.status_code, 400)
+        with self.assertRaises(BadRequest):
+            partner_obj.search_read_nested(fields=["name", "no_such_field"])
+
+    def test_invalid_extra_fields(self):
+        with self.assertRaises(BadRequest):
+            pinguin.get_dictlist_from_model(
+                "res.partner", ("name",), env=self.env, include_fields=(42,)
+            )
+
+    def test_plan_is_cached(self):
+        partner_obj = self.env["res.partner"]
+        spec = ("name", "company_id/name", "category_id/name")
+        plan = pinguin.get_plan(partner_obj, spec)
+        # (1) the plan of a spec is compiled once
+        # (2) nested string fields are resolved into nested nodes
+        self.assertIs(plan, pinguin.get_plan(partner_obj, spec))
+        self.assertEqual([node.name for node in plan], list(spec[:1]) + ["company_id", "category_id"])
+        self.assertFalse(plan[1].many)
+        self.assertTrue(plan[2].many)
+
+    def test_plan_with_lists_is_cached(self):
+        partner_obj = self.env["res.partner"]
+        spec = ("name", ("category_id", ["name"]), ("company_id", ["name"]))
+        plan = pinguin.get_plan(partner_obj, spec)
+        # (1) specs with 2many sub-specs, given as lists, are cached too
+        # (2) a list and a tuple sub-spec keep their own plans
+        same_spec = ("name", ("category_id", ["name"]), ("company_id", ["name"]))
+        self.assertIs(plan, pinguin.get_plan(partner_obj, same_spec))
+        self.assertTrue(plan[1].many)
+        self.assertTrue(plan[2].many)
+        tuple_spec = ("name", ("category_id", ["name"]), ("company_id", ("name",)))
+        tuple_plan = pinguin.get_plan(partner_obj, tuple_spec)
+        self.assertIsNot(tuple_plan, plan)
+        self.assertFalse(tuple_plan[2].many)
+        with self.assertRaises(BadRequest):
+            pinguin.get_plan(partner_obj, ("name", ("category_id", ("name",))))
+
+    def test_parse_strfields(self):
+        fields = (
+            "name",
+            "email",
+            "bank_ids/bank_id/id",
+            "bank_ids/bank_name",
+            "bank_ids/.id",
+        )
+        parsed = pinguin.parse_strfields(fields, "/")
+        # (1) nested paths are merged into one tree
+        # (2) the tree is parsed once per (fields, delimiter)
+        self.assertEqual(
+            parsed,
+            {
+                "name": None,
+                "email": None,
+                "bank_ids": {"bank_id": {"id": None}, "bank_name": None, "id": None},
+            },
+        )
+        self.assertIs(parsed, pinguin.parse_strfields(fields, "/"))
+        self.assertIsNot(parsed, pinguin.parse_strfields(fields, "."))
+        # (3) the tree does not depend on the order of the fields
+        expected = {"company_id": {"name": None}}
+        for fields in (
+            ("company_id", "company_id/name"),
+            ("company_id/name", "company_id"),
+        ):
+            self.assertEqual(pinguin.parse_strfields(fields, "/"), expected)
+
+    def test_shared_subtrees(self):
+        partner_obj = self.env["res.partner"]
+        t_company = self.env["res.company"].create({"name": "TestSharedCompany"})
+        t_partners = partner_obj.create(
+            [{"name": "TestShared", "company_id": t_company.id} for i in range(3)]
+        )
+        fields = ["name", "company_id/name", "company_id/country_id/name"]
+        domain = [("id", "in", t_partners.ids)]
+        #
+        # Test #1: the subtree of a related record is built once
+        #
+        result = partner_obj.search_read_nested(domain=domain, fields=fields)
+        self.assertEqual(result[0]["company_id"]["name"], "TestSharedCompany")
+        self.assertIs(result[0]["company_id"], result[2]["company_id"])
+        #
+        # Test #2: related records are emitted once in a side table
+        #
+        result = partner_obj.search_read_nested(
+            domain=domain, fields=fields, included=True
+        )
+        self.assertEqual(
+            [record["company_id"] for record in result["records"]], [t_company.id] * 3
+        )
+        self.assertEqual(
+            result["included"]["res.company"][str(t_company.id)],
+            {"name": "TestSharedCompany", "country_id": t_company.country_id.id},
+        )
+
+    def test_columnar_export_keeps_pending_writes(self):
+        partner_obj = self.env["res.partner"]
+        t_partners = partner_obj.create(
+            [{"name": "TestColumnarPending%s" % i} for i in range(2)]
+        )
+        t_partners.flush()
+        t_partners[0].write({"comment": "TestColumnarPending"})
+        partner_obj.search_read_columnar(
+            domain=[("id", "in", t_partners.ids)], fields=["name"], chunk_size=1
+        )
+        # (1) the cache emptied between chunks does not drop pending writes
+        self.env.cr.execute(
+            "SELECT comment FROM res_partner WHERE id = %s", [t_partners[0].id]
+        )
+        self.assertEqual(self.env.cr.fetchone()[0], "TestColumnarPending")
+
+    def test_columnar_export(self):
+        partner_obj = self.env["res.partner"]
+        t_company = self.env["res.company"].create({"name": "TestColumnarCompany"})
+        t_partners = partner_obj.create(
+            [
+                {"name": "TestColumnar%s" % i, "company_id": t_company.id}
+                for i in range(3)
+            ]
+        )
+        fields = ["name", "company_id/name", "category_id/name"]
+        domain = [("id", "in", t_partners.ids)]
+        result = partner_obj.search_read_columnar(
+            domain=domain, fields=fields, order="id", chunk_size=2
+        )
+        # (1) nested fields are flattened into columns named by their path
+        # (2) every chunk is appended to the columns
+        self.assertEqual(result["format"], "json")
+        self.assertEqual(result["columns"], fields)
+        self.assertEqual(
+            result["data"]["name"], ["TestColumnar0", "TestColumnar1", "TestColumnar2"]
+        )
+        self.assertEqual(result["data"]["company_id/name"], ["TestColumnarCompany"] * 3)
+        self.assertEqual(result["data"]["category_id/name"], [[], [], []])
+        with self.assertRaises(BadRequest):
+            partner_obj.search_read_columnar(fields=fields, fmt="xlsx")
+        try:
+            import pyarrow
+        except ImportError:
+            return
+        result = partner_obj.search_read_columnar(
+            domain=domain, fields=fields, order="id", fmt="arrow", chunk_size=2
+        )
+        # (3) files are sent base64 encoded, to go through XML-RPC and JSON-RPC
+        table = pyarrow.ipc.open_stream(base64.b64decode(result["data"])).read_all()
+        self.assertEqual(table.column_names, fields)
+        self.assertEqual(table.num_rows, 3)
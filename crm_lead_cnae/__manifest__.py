@@ -18,11 +18,16 @@
     'license': "LGPL-3",
 
     'category': 'Stock',
-    'version': '16.0.0.1',
+    'version': '16.0.0.7',
 
     'depends': ['crm'],
 
     'data': [
+        'security/ir.model.access.csv',
+        'data/crm.cnae.csv',
+        'data/crm_cnae_data.xml',
+        'data/ir_cron.xml',
+        'views/crm_cnae_views.xml',
         'views/view_crm_lead_form_cnae.xml',
     ],
 }
\ No newline at end of file
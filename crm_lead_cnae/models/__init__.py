@@ -1 +1,4 @@
-from . import crm_lead
\ No newline at end of file
+from . import crm_cnae
+from . import crm_lead_cnae_segment
+from . import crm_lead
+from . import crm_lead_cnae_enrichment
@@ -0,0 +1,91 @@
+from odoo import api, fields, models, tools
+
+CNAE_LEVELS = [
+    ('section', 'Seccion'),
+    ('division', 'Division'),
+    ('group', 'Grupo'),
+    ('class', 'Clase'),
+]
+
+
+def normalize_cnae_code(code):
+    """Codigo CNAE sin separadores: '47.11' -> '4711', 'g' -> 'G'"""
+    code = ''.join(c for c in code or '' if c.isalnum()).upper()
+    digits = ''.join(c for c in code if c.isdigit())
+    if digits:
+        return digits
+    return code if len(code) == 1 else False
+
+
+class CrmCnae(models.Model):
+    """Clasificacion CNAE-2009: seccion, division, grupo y clase. Los
+    ancestros de cada codigo se guardan en ``parent_path`` para filtrar
+    con ``child_of`` sobre un indice."""
+    _name = 'crm.cnae'
+    _description = 'Clasificacion CNAE'
+    _order = 'code'
+    _parent_store = True
+    _rec_names_search = ['code', 'name']
+
+    code = fields.Char(string="Codigo", required=True, index=True)
+    name = fields.Char(string="Descripcion", required=True)
+    level = fields.Selection(CNAE_LEVELS, string="Nivel", required=True)
+    parent_id = fields.Many2one('crm.cnae', string="Padre", index=True,
+                                ondelete='cascade')
+    parent_path = fields.Char(index=True, unaccent=False)
+    child_ids = fields.One2many('crm.cnae', 'parent_id', string="Subniveles")
+
+    _sql_constraints = [
+        ('code_uniq', 'unique (code)', 'El codigo CNAE ya existe'),
+    ]
+
+    def name_get(self):
+        return [(cnae.id, '%s - %s' % (cnae.code, cnae.name)) for cnae in self]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.clear_caches()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'code' in vals or 'parent_id' in vals:
+            self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.clear_caches()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_code_index(self):
+        """Codigo normalizado -> (id, ids de los ancestros desde la seccion)"""
+        self.flush_model(['code', 'parent_path'])
+        self.env.cr.execute("SELECT id, code, parent_path FROM crm_cnae")
+        return {
+            normalize_cnae_code(code): (
+                cnae_id, tuple(int(i) for i in parent_path.split('/') if i))
+            for cnae_id, code, parent_path in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _match_code(self, code):
+        """Nivel mas profundo de la clasificacion que contiene el codigo
+        ('4711' -> clase 47.11, o grupo 471 o division 47 si la clase no
+        esta cargada).
+
+        :returns: tupla (id, ids de los ancestros) o None
+        """
+        code = normalize_cnae_code(code)
+        if not code:
+            return None
+        index = self._get_code_index()
+        if not code.isdigit():
+            return index.get(code)
+        for length in (4, 3, 2):
+            if len(code) >= length and code[:length] in index:
+                return index[code[:length]]
+        return None
@@ -1,13 +1,171 @@
-from odoo import models, fields
+import hashlib
+import re
+
+from odoo import api, models, fields
+from odoo.tools import file_open
+
+from .crm_lead_cnae_segment import (
+    CNAE_SECTIONS, REVENUE_BANDS, SEGMENT_TRIGGER_FIELDS, SIZE_BANDS,
+    get_revenue_band, get_size_band)
+
+
+CNAE_DATA_FILE = 'crm_lead_cnae/data/crm.cnae.csv'
+CNAE_CHECKSUM_PARAM = 'crm_lead_cnae.cnae_checksum'
+
+
+def normalize_vat(vat):
+    """Devuelve el NIF/CIF en mayusculas, sin separadores ni prefijo ES"""
+    if not vat:
+        return False
+    vat = re.sub(r'[^0-9A-Za-z]', '', str(vat)).upper()
+    if len(vat) == 11 and vat.startswith('ES'):
+        vat = vat[2:]
+    return vat or False
+
 
 class CrmLead(models.Model):
     _inherit = 'crm.lead'
 
     cnae_vat = fields.Char(string="Identificacion Fiscal")
+    cnae_vat_normalized = fields.Char(string="Identificacion Fiscal normalizada",
+                                      compute='_compute_cnae_vat_normalized',
+                                      store=True, index=True)
     cnae_code = fields.Char(string="CNAE")
     company_status = fields.Char(string="Situacion de la empresa")
     employee_count = fields.Integer(string="Numero de Empleados")
     incorporation_date = fields.Date(string="Fecha de constitucion")
     capital_social = fields.Float(string="Capital Social", digits=(12,2))
     annual_revenue = fields.Float(string="Facturacion Anual", digits=(12,2))
-    last_balance_year = fields.Integer(string="Año del ultimo balance")
\ No newline at end of file
+    last_balance_year = fields.Integer(string="Año del ultimo balance")
+    cnae_id = fields.Many2one('crm.cnae', string="Actividad CNAE",
+                              compute='_compute_cnae_id', store=True,
+                              index=True)
+    cnae_section_id = fields.Many2one('crm.cnae', string="Seccion (CNAE)",
+                                      compute='_compute_cnae_id', store=True,
+                                      index=True)
+    cnae_division_id = fields.Many2one('crm.cnae', string="Division (CNAE)",
+                                       compute='_compute_cnae_id', store=True,
+                                       index=True)
+    cnae_section = fields.Selection(CNAE_SECTIONS, string="Seccion CNAE",
+                                    compute='_compute_cnae_segment',
+                                    store=True, index=True)
+    cnae_size_band = fields.Selection(SIZE_BANDS, string="Tamaño de empresa",
+                                      compute='_compute_cnae_segment',
+                                      store=True)
+    cnae_revenue_band = fields.Selection(REVENUE_BANDS,
+                                         string="Tramo de facturacion",
+                                         compute='_compute_cnae_segment',
+                                         store=True)
+
+    @api.depends('cnae_vat')
+    def _compute_cnae_vat_normalized(self):
+        for lead in self:
+            lead.cnae_vat_normalized = normalize_vat(lead.cnae_vat)
+
+    @api.depends('cnae_code')
+    def _compute_cnae_id(self):
+        """Enlaza el codigo con la clasificacion: actividad (nivel mas
+        profundo cargado), seccion y division"""
+        Cnae = self.env['crm.cnae']
+        for lead in self:
+            match = Cnae._match_code(lead.cnae_code)
+            cnae_id, path = match or (False, ())
+            lead.cnae_id = cnae_id
+            # parent_path: seccion/division/grupo/clase
+            lead.cnae_section_id = path[0] if path else False
+            lead.cnae_division_id = path[1] if len(path) > 1 else False
+
+    @api.model
+    def _cnae_relink(self, batch_size=1000):
+        """Recalcula el enlace CNAE y el segmento de los leads existentes
+        por bloques, tras cargar o ampliar la clasificacion.
+
+        :returns: numero de leads revisados
+        """
+        self.env.cr.execute("""
+            SELECT id FROM crm_lead
+             WHERE cnae_code IS NOT NULL OR cnae_id IS NOT NULL
+          ORDER BY id
+        """)
+        lead_ids = [row[0] for row in self.env.cr.fetchall()]
+        fnames = ['cnae_id', 'cnae_section_id', 'cnae_division_id',
+                  'cnae_section']
+        Lead = self.with_context(active_test=False, tracking_disable=True)
+        for start in range(0, len(lead_ids), batch_size):
+            leads = Lead.browse(lead_ids[start:start + batch_size])
+            for fname in fnames:
+                self.env.add_to_compute(self._fields[fname], leads)
+            leads.flush_recordset(fnames)
+            self.env.invalidate_all()
+        # La seccion de los leads puede haber cambiado de segmento
+        self.env['crm.lead.cnae.segment'].action_rebuild()
+        return len(lead_ids)
+
+    @api.model
+    def _cnae_relink_if_changed(self):
+        """Recalcula los enlaces solo si la clasificacion incluida en el
+        modulo ha cambiado desde la ultima vez (o en la instalacion).
+
+        :returns: True si se han recalculado
+        """
+        with file_open(CNAE_DATA_FILE, 'rb') as data_file:
+            checksum = hashlib.sha256(data_file.read()).hexdigest()
+        Param = self.env['ir.config_parameter'].sudo()
+        if Param.get_param(CNAE_CHECKSUM_PARAM) == checksum:
+            return False
+        self._cnae_relink()
+        Param.set_param(CNAE_CHECKSUM_PARAM, checksum)
+        return True
+
+    @api.depends('cnae_section_id.code', 'employee_count', 'annual_revenue')
+    def _compute_cnae_segment(self):
+        for lead in self:
+            lead.cnae_section = lead.cnae_section_id.code or False
+            lead.cnae_size_band = get_size_band(lead.employee_count)
+            lead.cnae_revenue_band = get_revenue_band(lead.annual_revenue)
+
+    def _get_cnae_segment_keys(self):
+        return {(lead.cnae_section or 'none', lead.cnae_size_band or 'unknown',
+                 lead.cnae_revenue_band or 'unknown')
+                for lead in self}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        leads = super().create(vals_list)
+        self.env['crm.lead.cnae.segment']._mark_dirty(
+            leads._get_cnae_segment_keys())
+        return leads
+
+    def write(self, vals):
+        if not SEGMENT_TRIGGER_FIELDS.intersection(vals):
+            return super().write(vals)
+        keys = self._get_cnae_segment_keys()
+        res = super().write(vals)
+        keys |= self._get_cnae_segment_keys()
+        self.env['crm.lead.cnae.segment']._mark_dirty(keys)
+        return res
+
+    def unlink(self):
+        keys = self._get_cnae_segment_keys()
+        res = super().unlink()
+        self.env['crm.lead.cnae.segment']._mark_dirty(keys)
+        return res
+
+    @api.model
+    def lookup_cnae_vats(self, vats):
+        """Busca varios NIF de una vez sobre la columna indexada.
+
+        :param list vats: NIF en cualquier formato.
+        :returns: diccionario NIF normalizado -> lista de ids de leads; los
+            NIF sin coincidencias no aparecen.
+        """
+        normalized = list({vat for vat in map(normalize_vat, vats) if vat})
+        result = {}
+        if not normalized:
+            return result
+        leads = self.with_context(active_test=False).search_read(
+            [('cnae_vat_normalized', 'in', normalized)],
+            ['cnae_vat_normalized'], order='id')
+        for lead in leads:
+            result.setdefault(lead['cnae_vat_normalized'], []).append(lead['id'])
+        return result
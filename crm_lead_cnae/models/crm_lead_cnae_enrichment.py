@@ -0,0 +1,150 @@
+import csv
+import gzip
+import json
+import logging
+import time
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+
+from .crm_lead import normalize_vat
+
+_logger = logging.getLogger(__name__)
+
+# Campos de crm.lead que se rellenan desde el registro mercantil
+ENRICHMENT_FIELDS = [
+    'cnae_code', 'company_status', 'employee_count', 'incorporation_date',
+    'capital_social', 'annual_revenue', 'last_balance_year',
+]
+# Columnas admitidas como identificador fiscal en el fichero
+VAT_COLUMNS = ('cnae_vat', 'vat', 'nif', 'cif')
+
+
+class CrmLeadCnaeEnrichment(models.AbstractModel):
+    _name = 'crm.lead.cnae.enrichment'
+    _description = 'Enriquecimiento CNAE de leads'
+
+    @api.model
+    def _open_registry(self, path):
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rt', encoding='utf-8', newline='')
+        return open(path, 'r', encoding='utf-8', newline='')
+
+    @api.model
+    def _iter_registry(self, path, file_format=None, delimiter=','):
+        """Lee el fichero fila a fila sin cargarlo en memoria"""
+        if not file_format:
+            name = path[:-3] if path.endswith('.gz') else path
+            file_format = 'jsonl' if name.endswith(('.jsonl', '.json')) else 'csv'
+        with self._open_registry(path) as registry:
+            if file_format == 'csv':
+                yield from csv.DictReader(registry, delimiter=delimiter)
+            elif file_format == 'jsonl':
+                for line in registry:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                raise UserError("Formato de fichero no soportado: %s" % file_format)
+
+    @api.model
+    def _convert_value(self, field, value):
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            return None
+        if field.type == 'integer':
+            return int(float(str(value).replace(',', '.')))
+        if field.type == 'float':
+            return float(str(value).replace(',', '.'))
+        if field.type == 'date':
+            return fields.Date.to_date(value)
+        return str(value)
+
+    @api.model
+    def _prepare_lead_vals(self, row):
+        lead_fields = self.env['crm.lead']._fields
+        vals = {}
+        for fname in ENRICHMENT_FIELDS:
+            value = self._convert_value(lead_fields[fname], row.get(fname))
+            if value is not None:
+                vals[fname] = value
+        return vals
+
+    @api.model
+    def _write_chunk(self, chunk):
+        """Escribe un bloque de filas del registro en los leads que coinciden.
+
+        :returns: tupla (NIF con coincidencia, leads actualizados)
+        """
+        Lead = self.env['crm.lead'].with_context(
+            active_test=False, tracking_disable=True)
+        lead_index = Lead.lookup_cnae_vats(list(chunk))
+        # Una sola escritura por cada conjunto de valores distinto
+        groups = {}
+        for vat, lead_ids in lead_index.items():
+            key = tuple(sorted(chunk[vat].items()))
+            groups.setdefault(key, []).extend(lead_ids)
+        updated = 0
+        for key, lead_ids in groups.items():
+            Lead.browse(lead_ids).write(dict(key))
+            updated += len(lead_ids)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        return len(lead_index), updated
+
+    @api.model
+    def _enrich_from_file(self, path, file_format=None, delimiter=',',
+                         chunk_size=1000):
+        """Rellena los campos CNAE de los leads desde un volcado del registro.
+
+        El fichero (CSV o JSONL, opcionalmente .gz) se lee en streaming; las
+        filas se agrupan en bloques de ``chunk_size`` NIF distintos, cada
+        bloque se cruza con los leads en una sola consulta indexada y se
+        escribe y libera de la cache antes de leer el siguiente.
+
+        Metodo privado: abre una ruta del servidor, por lo que no se expone
+        por RPC; se lanza desde la shell o una accion de servidor.
+
+        :returns: diccionario con las filas leidas, descartadas, leads
+            actualizados, tiempo empleado y filas por segundo.
+        """
+        start = time.time()
+        stats = {'rows': 0, 'skipped': 0, 'matched': 0, 'updated': 0}
+        chunk = {}
+        for row in self._iter_registry(path, file_format, delimiter):
+            stats['rows'] += 1
+            vat = normalize_vat(next(
+                (row[col] for col in VAT_COLUMNS if row.get(col)), False))
+            try:
+                vals = self._prepare_lead_vals(row) if vat else {}
+            except (TypeError, ValueError):
+                vals = {}
+            if not vals:
+                stats['skipped'] += 1
+                continue
+            chunk[vat] = vals
+            if len(chunk) >= chunk_size:
+                self._flush_chunk(chunk, stats)
+                chunk = {}
+                self._log_progress(stats, start)
+        if chunk:
+            self._flush_chunk(chunk, stats)
+        self._log_progress(stats, start)
+        stats['seconds'] = time.time() - start
+        stats['rows_per_second'] = stats['rows'] / (stats['seconds'] or 1)
+        return stats
+
+    @api.model
+    def _flush_chunk(self, chunk, stats):
+        matched, updated = self._write_chunk(chunk)
+        stats['matched'] += matched
+        stats['updated'] += updated
+
+    @api.model
+    def _log_progress(self, stats, start):
+        elapsed = time.time() - start
+        _logger.info(
+            "Enriquecimiento CNAE: %d filas leidas, %d coincidencias, "
+            "%d leads actualizados (%.0f filas/s)",
+            stats['rows'], stats['matched'], stats['updated'],
+            stats['rows'] / (elapsed or 1))
@@ -0,0 +1,249 @@
+from odoo import api, fields, models
+
+# Secciones CNAE-2009, codigos de nivel 'section' de crm.cnae
+CNAE_SECTIONS = [
+    ('A', 'A - Agricultura, ganaderia, silvicultura y pesca'),
+    ('B', 'B - Industrias extractivas'),
+    ('C', 'C - Industria manufacturera'),
+    ('D', 'D - Suministro de energia electrica, gas, vapor y aire acondicionado'),
+    ('E', 'E - Suministro de agua, saneamiento, gestion de residuos'),
+    ('F', 'F - Construccion'),
+    ('G', 'G - Comercio al por mayor y al por menor'),
+    ('H', 'H - Transporte y almacenamiento'),
+    ('I', 'I - Hosteleria'),
+    ('J', 'J - Informacion y comunicaciones'),
+    ('K', 'K - Actividades financieras y de seguros'),
+    ('L', 'L - Actividades inmobiliarias'),
+    ('M', 'M - Actividades profesionales, cientificas y tecnicas'),
+    ('N', 'N - Actividades administrativas y servicios auxiliares'),
+    ('O', 'O - Administracion Publica y defensa'),
+    ('P', 'P - Educacion'),
+    ('Q', 'Q - Actividades sanitarias y de servicios sociales'),
+    ('R', 'R - Actividades artisticas, recreativas y de entretenimiento'),
+    ('S', 'S - Otros servicios'),
+    ('T', 'T - Actividades de los hogares'),
+    ('U', 'U - Organizaciones y organismos extraterritoriales'),
+]
+SIZE_BANDS = [
+    ('unknown', 'Sin datos'),
+    ('micro', 'Micro (< 10)'),
+    ('small', 'Pequeña (10 - 49)'),
+    ('medium', 'Mediana (50 - 249)'),
+    ('large', 'Grande (250 o mas)'),
+]
+REVENUE_BANDS = [
+    ('unknown', 'Sin datos'),
+    ('micro', '< 2M'),
+    ('small', '2M - 10M'),
+    ('medium', '10M - 50M'),
+    ('large', '50M o mas'),
+]
+# Campos de crm.lead que cambian los agregados de su segmento
+SEGMENT_TRIGGER_FIELDS = {
+    'cnae_code', 'employee_count', 'annual_revenue', 'expected_revenue',
+    'stage_id', 'active', 'probability',
+}
+SEGMENT_KEY = ('cnae_section', 'size_band', 'revenue_band')
+SEGMENT_VALUES = ('lead_count', 'won_count', 'lost_count', 'expected_revenue',
+                  'win_rate')
+
+
+def get_size_band(employee_count):
+    if not employee_count:
+        return 'unknown'
+    if employee_count < 10:
+        return 'micro'
+    if employee_count < 50:
+        return 'small'
+    if employee_count < 250:
+        return 'medium'
+    return 'large'
+
+
+def get_revenue_band(annual_revenue):
+    if not annual_revenue:
+        return 'unknown'
+    if annual_revenue < 2000000:
+        return 'micro'
+    if annual_revenue < 10000000:
+        return 'small'
+    if annual_revenue < 50000000:
+        return 'medium'
+    return 'large'
+
+
+class CrmLeadCnaeSegmentQueue(models.Model):
+    """Cola de segmentos pendientes de recalcular. Las escrituras en crm.lead
+    solo insertan filas nuevas, sin restriccion unica ni UPDATE, de modo que
+    no bloquean ninguna fila compartida entre transacciones concurrentes."""
+    _name = 'crm.lead.cnae.segment.queue'
+    _description = 'Segmentos CNAE pendientes de recalcular'
+    _log_access = False
+
+    cnae_section = fields.Char(required=True)
+    size_band = fields.Char(required=True)
+    revenue_band = fields.Char(required=True)
+
+
+class CrmLeadCnaeSegment(models.Model):
+    """Agregados de leads por seccion CNAE y tamaño, mantenidos de forma
+    incremental: las escrituras en crm.lead encolan sus segmentos y estos
+    se recalculan al consultarlos o desde el cron."""
+    _name = 'crm.lead.cnae.segment'
+    _description = 'Segmento CNAE de leads'
+    _order = 'cnae_section, size_band, revenue_band'
+
+    cnae_section = fields.Selection(CNAE_SECTIONS + [('none', 'Sin CNAE')],
+                                    string="Seccion CNAE", required=True,
+                                    readonly=True)
+    size_band = fields.Selection(SIZE_BANDS, string="Tamaño", required=True,
+                                 readonly=True)
+    revenue_band = fields.Selection(REVENUE_BANDS, string="Facturacion",
+                                    required=True, readonly=True)
+    lead_count = fields.Integer(string="Leads activos", readonly=True)
+    won_count = fields.Integer(string="Ganadas", readonly=True)
+    lost_count = fields.Integer(string="Perdidas", readonly=True)
+    expected_revenue = fields.Float(string="Ingreso esperado", readonly=True)
+    win_rate = fields.Float(string="Ratio de exito (%)", readonly=True,
+                            group_operator='avg')
+
+    _sql_constraints = [
+        ('segment_uniq', 'unique (cnae_section, size_band, revenue_band)',
+         'El segmento ya existe'),
+    ]
+
+    @api.model
+    def _mark_dirty(self, keys):
+        """Encola los segmentos (seccion, tamaño, facturacion) para su
+        recalculo. Es un INSERT simple: no toma bloqueos de fila ni espera a
+        otras transacciones que encolen el mismo segmento."""
+        if not keys:
+            return
+        values = ', '.join(['(%s, %s, %s)'] * len(keys))
+        params = [value for key in keys for value in key]
+        self.env.cr.execute("""
+            INSERT INTO crm_lead_cnae_segment_queue
+                (cnae_section, size_band, revenue_band)
+            VALUES %s
+        """ % values, params)
+
+    @api.model
+    def _compute_aggregates(self, keys=None):
+        """Agrega crm.lead en una sola consulta, opcionalmente solo para
+        los segmentos indicados"""
+        self.env['crm.lead'].flush_model([
+            'cnae_section', 'cnae_size_band', 'cnae_revenue_band', 'active',
+            'probability', 'expected_revenue', 'stage_id'])
+        where, params = '', []
+        if keys is not None:
+            where = """WHERE (COALESCE(l.cnae_section, 'none'),
+                              COALESCE(l.cnae_size_band, 'unknown'),
+                              COALESCE(l.cnae_revenue_band, 'unknown')) IN %s"""
+            params = [tuple(keys)]
+        self.env.cr.execute("""
+            SELECT COALESCE(l.cnae_section, 'none'),
+                   COALESCE(l.cnae_size_band, 'unknown'),
+                   COALESCE(l.cnae_revenue_band, 'unknown'),
+                   count(*) FILTER (WHERE l.active),
+                   count(*) FILTER (WHERE l.active AND s.is_won),
+                   count(*) FILTER (WHERE NOT l.active
+                                    AND COALESCE(l.probability, 0) = 0),
+                   COALESCE(sum(l.expected_revenue) FILTER (WHERE l.active), 0)
+              FROM crm_lead l
+              LEFT JOIN crm_stage s ON s.id = l.stage_id
+              %s
+          GROUP BY 1, 2, 3
+        """ % where, params)
+        result = {}
+        for section, size, revenue, count, won, lost, amount in self.env.cr.fetchall():
+            closed = won + lost
+            result[(section, size, revenue)] = {
+                'lead_count': count,
+                'won_count': won,
+                'lost_count': lost,
+                'expected_revenue': amount,
+                'win_rate': closed and 100.0 * won / closed,
+            }
+        return result
+
+    @api.model
+    def _refresh_dirty(self):
+        """Vacia la cola y recalcula solo los segmentos encolados. Las filas
+        bloqueadas por otro recalculo en curso se saltan."""
+        self.env.cr.execute("""
+            DELETE FROM crm_lead_cnae_segment_queue
+             WHERE id IN (SELECT id FROM crm_lead_cnae_segment_queue
+                          FOR UPDATE SKIP LOCKED)
+         RETURNING cnae_section, size_band, revenue_band
+        """)
+        keys = set(self.env.cr.fetchall())
+        if not keys:
+            return
+        aggregates = self._compute_aggregates(list(keys))
+        empty = dict.fromkeys(SEGMENT_VALUES, 0)
+        params = []
+        for key in sorted(keys):
+            values = aggregates.get(key, empty)
+            params.extend(key)
+            params.extend(values[fname] for fname in SEGMENT_VALUES)
+        self.flush_model()
+        # Los segmentos solo los escribe el recalculo, nunca crm.lead
+        self.env.cr.execute("""
+            INSERT INTO crm_lead_cnae_segment
+                (cnae_section, size_band, revenue_band, %s)
+            VALUES %s
+            ON CONFLICT (cnae_section, size_band, revenue_band)
+            DO UPDATE SET %s
+        """ % (
+            ', '.join(SEGMENT_VALUES),
+            ', '.join(['(%s)' % ', '.join(['%s'] * 8)] * len(keys)),
+            ', '.join('%s = EXCLUDED.%s' % (fname, fname)
+                      for fname in SEGMENT_VALUES),
+        ), params)
+        self.invalidate_model()
+
+    @api.model
+    def action_rebuild(self):
+        """Reconstruye la tabla completa de agregados"""
+        self.env.cr.execute("DELETE FROM crm_lead_cnae_segment_queue")
+        aggregates = self._compute_aggregates()
+        self.search([]).unlink()
+        self.create([dict(zip(SEGMENT_KEY, key), **values)
+                     for key, values in aggregates.items()])
+
+    @api.model
+    def _cron_refresh(self):
+        self._refresh_dirty()
+
+    @api.model
+    def get_segment_stats(self, groupby=('cnae_section', 'size_band')):
+        """Estadisticas de pipeline por segmento servidas desde la tabla de
+        agregados.
+
+        :param groupby: campos de agrupacion entre ``cnae_section``,
+            ``size_band`` y ``revenue_band``.
+        :returns: lista de diccionarios con los valores de agrupacion, leads
+            activos, ganadas, perdidas, ingreso esperado y ratio de exito.
+        """
+        groupby = list(groupby)
+        if not set(groupby) <= set(SEGMENT_KEY):
+            raise ValueError("Agrupacion no soportada: %s" % groupby)
+        # Los comerciales solo leen los agregados: el recalculo se hace
+        # como superusuario
+        self.sudo()._refresh_dirty()
+        groups = self.read_group(
+            [], ['lead_count:sum', 'won_count:sum', 'lost_count:sum',
+                 'expected_revenue:sum'], groupby, lazy=False)
+        result = []
+        for group in groups:
+            closed = group['won_count'] + group['lost_count']
+            row = {fname: group[fname] for fname in groupby}
+            row.update({
+                'lead_count': group['lead_count'],
+                'won_count': group['won_count'],
+                'lost_count': group['lost_count'],
+                'expected_revenue': group['expected_revenue'],
+                'win_rate': closed and 100.0 * group['won_count'] / closed,
+            })
+            result.append(row)
+        return result
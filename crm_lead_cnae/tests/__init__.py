@@ -0,0 +1,4 @@
+from . import test_crm_cnae
+from . import test_crm_lead_cnae_enrichment
+from . import test_crm_lead_cnae_segment
+from . import test_crm_lead_vat
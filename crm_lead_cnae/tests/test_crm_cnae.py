@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestCrmCnae(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Cnae = cls.env['crm.cnae']
+        cls.class_4711 = cls.env.ref('crm_lead_cnae.cnae_4711')
+        cls.group_471 = cls.env.ref('crm_lead_cnae.cnae_471')
+        cls.section_g = cls.env.ref('crm_lead_cnae.cnae_G')
+
+    def test_classification_levels(self):
+        # La clasificacion cargada llega hasta la clase, con sus ancestros
+        self.assertEqual(self.class_4711.level, 'class')
+        self.assertEqual(self.class_4711.parent_id, self.group_471)
+        self.assertEqual(self.group_471.parent_id,
+                         self.env.ref('crm_lead_cnae.cnae_47'))
+        self.assertEqual(self.env.ref('crm_lead_cnae.cnae_47').parent_id,
+                         self.section_g)
+        # Clases propias de la CNAE-2009
+        self.assertEqual(self.env.ref('crm_lead_cnae.cnae_1043').parent_id,
+                         self.env.ref('crm_lead_cnae.cnae_104'))
+
+    def test_match_code(self):
+        for code in ('4711', '47.11', '471100'):
+            self.assertEqual(self.Cnae._match_code(code)[0], self.class_4711.id)
+        self.assertEqual(self.Cnae._match_code('g')[0], self.section_g.id)
+        self.assertIsNone(self.Cnae._match_code('00'))
+        self.assertIsNone(self.Cnae._match_code(False))
+
+    def test_lead_link_and_child_of(self):
+        Lead = self.env['crm.lead']
+        lead_4711, lead_4719, lead_4110 = Lead.create([
+            {'name': 'Supermercado', 'cnae_code': '4711'},
+            {'name': 'Bazar', 'cnae_code': '47.19'},
+            {'name': 'Promotora', 'cnae_code': '4110'},
+        ])
+        self.assertEqual(lead_4711.cnae_id, self.class_4711)
+        self.assertEqual(lead_4711.cnae_section_id, self.section_g)
+        self.assertEqual(lead_4711.cnae_division_id,
+                         self.env.ref('crm_lead_cnae.cnae_47'))
+        leads = lead_4711 | lead_4719 | lead_4110
+        self.assertEqual(
+            Lead.search([('id', 'in', leads.ids),
+                         ('cnae_id', 'child_of', self.group_471.id)]),
+            lead_4711 | lead_4719)
+        self.assertEqual(
+            Lead.search([('id', 'in', leads.ids),
+                         ('cnae_id', 'child_of', self.section_g.id)]),
+            lead_4711 | lead_4719)
+
+    def test_lead_segment_section(self):
+        # La seccion del segmento es la de la clasificacion enlazada
+        lead = self.env['crm.lead'].create({'name': 'Constructora',
+                                            'cnae_code': '4121'})
+        self.assertEqual(lead.cnae_section, 'F')
+        lead.cnae_code = '6201'
+        self.assertEqual(lead.cnae_section, 'J')
+        lead.cnae_code = '0000'
+        self.assertFalse(lead.cnae_section)
+
+    def test_relink_only_when_data_changes(self):
+        Lead = self.env['crm.lead']
+        Param = self.env['ir.config_parameter'].sudo()
+        # Tras la instalacion el fichero de codigos ya esta enlazado
+        self.assertNotEqual(Param.get_param('crm_lead_cnae.cnae_checksum'), '-')
+        with patch.object(type(Lead), '_cnae_relink', autospec=True) as relink:
+            self.assertFalse(Lead._cnae_relink_if_changed())
+            relink.assert_not_called()
+            # Si cambia el fichero, se recalculan los enlaces una sola vez
+            Param.set_param('crm_lead_cnae.cnae_checksum', 'antiguo')
+            self.assertTrue(Lead._cnae_relink_if_changed())
+            self.assertFalse(Lead._cnae_relink_if_changed())
+            self.assertEqual(relink.call_count, 1)
@@ -0,0 +1,111 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import date
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestCrmLeadCnaeEnrichment(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Enrichment = cls.env['crm.lead.cnae.enrichment']
+        cls.lead_a, cls.lead_b, cls.lead_c, cls.lead_d = cls.env['crm.lead'].create([
+            {'name': 'Empresa A', 'cnae_vat': 'ES-B12345678'},
+            {'name': 'Empresa B', 'cnae_vat': 'B 87654321'},
+            {'name': 'Empresa B bis', 'cnae_vat': 'b87654321'},
+            {'name': 'Empresa D', 'cnae_vat': '12345678'},
+        ])
+
+    def _write_file(self, name, rows, compress=False):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, name)
+        opener = gzip.open if compress else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as registry:
+            if '.csv' in name:
+                writer = csv.DictWriter(registry, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    registry.write(json.dumps(row) + '\n')
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv_dump(self):
+        path = self._write_file('registro.csv', [
+            {'nif': 'B12345678', 'cnae_code': '4711', 'employee_count': '12',
+             'annual_revenue': '1500000,50', 'incorporation_date': '2001-05-03'},
+            {'nif': 'B87654321', 'cnae_code': '6201', 'employee_count': '',
+             'annual_revenue': '', 'incorporation_date': ''},
+            {'nif': 'X00000000', 'cnae_code': '4110', 'employee_count': '1',
+             'annual_revenue': '', 'incorporation_date': ''},
+            {'nif': '', 'cnae_code': '4110', 'employee_count': '1',
+             'annual_revenue': '', 'incorporation_date': ''},
+        ])
+        stats = self.Enrichment._enrich_from_file(path)
+        self.assertEqual((stats['rows'], stats['skipped'], stats['matched'],
+                          stats['updated']), (4, 1, 2, 3))
+        self.assertEqual(self.lead_a.cnae_code, '4711')
+        self.assertEqual(self.lead_a.employee_count, 12)
+        self.assertEqual(self.lead_a.annual_revenue, 1500000.5)
+        self.assertEqual(self.lead_a.incorporation_date, date(2001, 5, 3))
+        # Los NIF con otro formato coinciden con el normalizado
+        self.assertEqual((self.lead_b | self.lead_c).mapped('cnae_code'),
+                         ['6201', '6201'])
+        self.assertFalse(self.lead_d.cnae_code)
+
+    def test_jsonl_gz_dump_non_string_vat(self):
+        path = self._write_file('registro.jsonl.gz', [
+            {'cif': 12345678, 'cnae_code': 4711, 'employee_count': 3},
+            {'cif': 'B12345678', 'employee_count': 'no es un numero'},
+        ], compress=True)
+        stats = self.Enrichment._enrich_from_file(path)
+        self.assertEqual((stats['rows'], stats['skipped'], stats['updated']),
+                         (2, 1, 1))
+        self.assertEqual(self.lead_d.cnae_code, '4711')
+        self.assertEqual(self.lead_d.employee_count, 3)
+        self.assertFalse(self.lead_a.cnae_code)
+
+    def test_chunks(self):
+        path = self._write_file('registro.csv', [
+            {'nif': vat, 'cnae_code': '4711'}
+            for vat in ('B12345678', 'B87654321', '12345678', 'X00000000',
+                        'B12345678')
+        ])
+        Enrichment = type(self.Enrichment)
+        with patch.object(Enrichment, '_write_chunk', autospec=True,
+                          side_effect=Enrichment._write_chunk) as write_chunk:
+            stats = self.Enrichment._enrich_from_file(path, chunk_size=2)
+        # 4 NIF distintos en bloques de 2; el ultimo repite un NIF ya escrito
+        self.assertEqual([len(call.args[1]) for call in write_chunk.call_args_list],
+                         [2, 2, 1])
+        self.assertEqual(stats['updated'], 5)
+        self.assertEqual(
+            (self.lead_a | self.lead_b | self.lead_c | self.lead_d).mapped(
+                'cnae_code'), ['4711'] * 4)
+
+    def test_identical_values_single_write(self):
+        # Los leads que reciben los mismos valores se escriben juntos
+        Lead = type(self.env['crm.lead'])
+        with patch.object(Lead, 'write', autospec=True,
+                          side_effect=Lead.write) as write:
+            self.Enrichment._write_chunk({
+                'B12345678': {'cnae_code': '4711'},
+                'B87654321': {'cnae_code': '4711'},
+                '12345678': {'cnae_code': '6201'},
+            })
+        written = sorted((sorted(call.args[0].ids), call.args[1]['cnae_code'])
+                         for call in write.call_args_list
+                         if 'cnae_code' in call.args[1])
+        self.assertEqual(written, [
+            (sorted((self.lead_a | self.lead_b | self.lead_c).ids), '4711'),
+            (self.lead_d.ids, '6201'),
+        ])
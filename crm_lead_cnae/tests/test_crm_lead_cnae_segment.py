@@ -0,0 +1,105 @@
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+# Segmento sin leads en los datos de demo: seccion U, grandes empresas
+KEY = ('U', 'large', 'large')
+LEAD_VALS = {'cnae_code': '9900', 'employee_count': 300,
+             'annual_revenue': 60000000}
+
+
+@tagged('post_install', '-at_install')
+class TestCrmLeadCnaeSegment(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Segment = cls.env['crm.lead.cnae.segment']
+        cls.Segment._refresh_dirty()
+        cls.stage_won = cls.env['crm.stage'].create({'name': 'Ganada',
+                                                     'is_won': True})
+
+    def _create_leads(self, *vals_list):
+        return self.env['crm.lead'].create([
+            dict(LEAD_VALS, name='Lead %d' % index, **vals)
+            for index, vals in enumerate(vals_list)])
+
+    def _queued(self, key=KEY):
+        self.env.cr.execute("""
+            SELECT count(*) FROM crm_lead_cnae_segment_queue
+             WHERE (cnae_section, size_band, revenue_band) = %s
+        """, [key])
+        return self.env.cr.fetchone()[0]
+
+    def _segment(self, key=KEY):
+        return self.Segment.search([('cnae_section', '=', key[0]),
+                                    ('size_band', '=', key[1]),
+                                    ('revenue_band', '=', key[2])])
+
+    def test_segment_keys(self):
+        lead = self._create_leads({})
+        self.assertEqual((lead.cnae_section, lead.cnae_size_band,
+                          lead.cnae_revenue_band), KEY)
+        lead.write({'cnae_code': False, 'employee_count': 0,
+                    'annual_revenue': 0})
+        self.assertEqual(lead._get_cnae_segment_keys(),
+                         {('none', 'unknown', 'unknown')})
+
+    def test_queue(self):
+        # Un INSERT por operacion, con los segmentos distintos afectados
+        leads = self._create_leads({}, {})
+        self.assertEqual(self._queued(), 1)
+        leads.write({'expected_revenue': 1000})
+        self.assertEqual(self._queued(), 2)
+        leads.write({'name': 'Sin cambio de segmento'})
+        self.assertEqual(self._queued(), 2)
+        leads[0].write({'employee_count': 20})
+        self.assertEqual(self._queued(), 3)
+        self.assertEqual(self._queued(('U', 'small', 'large')), 1)
+
+    def test_refresh_dirty(self):
+        lead_open, lead_won, lead_lost = self._create_leads(
+            {'expected_revenue': 1000}, {'expected_revenue': 500},
+            {'expected_revenue': 200})
+        lead_won.stage_id = self.stage_won
+        lead_lost.write({'active': False, 'probability': 0})
+        self.Segment._refresh_dirty()
+        self.assertEqual(self._queued(), 0)
+        segment = self._segment()
+        self.assertEqual(
+            (segment.lead_count, segment.won_count, segment.lost_count,
+             segment.expected_revenue, segment.win_rate),
+            (2, 1, 1, 1500, 50.0))
+        (lead_open | lead_won | lead_lost).unlink()
+        self.Segment._refresh_dirty()
+        self.assertEqual((segment.lead_count, segment.won_count,
+                          segment.lost_count), (0, 0, 0))
+
+    def test_aggregates_null_bands(self):
+        # Las bandas NULL cuentan como 'unknown' tambien al filtrar
+        lead = self._create_leads({})
+        lead.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE crm_lead SET cnae_size_band = NULL, cnae_revenue_band = NULL
+             WHERE id = %s
+        """, [lead.id])
+        lead.invalidate_recordset()
+        key = ('U', 'unknown', 'unknown')
+        aggregates = self.Segment._compute_aggregates([key])
+        self.assertEqual(list(aggregates), [key])
+        self.assertEqual(aggregates[key]['lead_count'], 1)
+        self.assertEqual(self.Segment._compute_aggregates()[key],
+                         aggregates[key])
+
+    def test_rebuild_and_stats(self):
+        self._create_leads({'expected_revenue': 300}, {})
+        self.Segment.action_rebuild()
+        self.assertEqual(self._queued(), 0)
+        self.assertEqual(self._segment().lead_count, 2)
+        self._create_leads({'expected_revenue': 100})
+        # Las estadisticas vacian la cola antes de leer los agregados
+        stats = self.Segment.get_segment_stats(['cnae_section'])
+        row = next(row for row in stats if row['cnae_section'] == 'U')
+        self.assertEqual((row['lead_count'], row['expected_revenue']),
+                         (3, 400))
+        with self.assertRaises(ValueError):
+            self.Segment.get_segment_stats(['stage_id'])
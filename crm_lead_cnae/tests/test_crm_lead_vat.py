@@ -0,0 +1,46 @@
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.crm_lead import normalize_vat
+
+
+@tagged('post_install', '-at_install')
+class TestCrmLeadVat(TransactionCase):
+
+    def test_normalize_vat(self):
+        # Prefijo ES, espacios, guiones y minusculas
+        self.assertEqual(normalize_vat('ES-B12345678'), 'B12345678')
+        self.assertEqual(normalize_vat('es 12.345.678-z'), '12345678Z')
+        self.assertEqual(normalize_vat(' B 1234 5678 '), 'B12345678')
+        # Otros prefijos de pais se conservan
+        self.assertEqual(normalize_vat('FR 12 345678901'), 'FR12345678901')
+        self.assertEqual(normalize_vat('PT123456789'), 'PT123456789')
+        # Valores que no son texto
+        self.assertEqual(normalize_vat(12345678), '12345678')
+        self.assertFalse(normalize_vat(None))
+        self.assertFalse(normalize_vat(False))
+        self.assertFalse(normalize_vat(' - '))
+
+    def test_normalized_vat_stored(self):
+        lead = self.env['crm.lead'].create({'name': 'Empresa',
+                                            'cnae_vat': 'ES B-12345678'})
+        self.assertEqual(lead.cnae_vat_normalized, 'B12345678')
+        lead.cnae_vat = 'b-87654321'
+        self.assertEqual(lead.cnae_vat_normalized, 'B87654321')
+
+    def test_lookup_cnae_vats(self):
+        Lead = self.env['crm.lead']
+        lead_a, lead_b, lead_c, lead_d = Lead.create([
+            {'name': 'A', 'cnae_vat': 'B12345678'},
+            {'name': 'B', 'cnae_vat': 'ES-B12345678'},
+            {'name': 'C', 'cnae_vat': '12345678Z', 'active': False},
+            {'name': 'D', 'cnae_vat': 'A11111111'},
+        ])
+        result = Lead.lookup_cnae_vats(
+            ['b 12345678', 'ES12345678-Z', 'X00000000', None, ''])
+        self.assertEqual(result, {
+            'B12345678': [lead_a.id, lead_b.id],
+            '12345678Z': [lead_c.id],
+        })
+        self.assertEqual(Lead.lookup_cnae_vats([]), {})
+        self.assertEqual(Lead.lookup_cnae_vats([False, ' ']), {})
@@ -33,6 +33,8 @@
                 ],
 
     'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'report/report_pedido.xml',
         'report/report_invoice_document_nds.xml',
 
@@ -3,4 +3,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/a
 
 from . import report_albarán_descripcion
+from . import ir_actions_report
+from . import account_move
+from . import report_nds_cache
 
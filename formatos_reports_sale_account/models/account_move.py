@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+from odoo import models
+
+NDS_AMOUNT_FIELDS = ('price_unit', 'price_subtotal', 'price_total')
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _get_nds_line_amounts(self, lines=None):
+        """Formats the amounts of every invoice line in one pass, with the
+        partner language separators and the currency decimals.
+
+        returns: dictionary {line_id: {'price_unit': str, 'price_subtotal': str, 'price_total': str}}
+        """
+        self.ensure_one()
+        if lines is None:
+            lines = self.invoice_line_ids
+        Lang = self.env['res.lang']
+        lang = Lang._lang_get(self.partner_id.lang or self.env.lang) or Lang._lang_get('en_US')
+        percent = '%%.%sf' % self.currency_id.decimal_places
+        return {
+            line['id']: {
+                fname: lang.format(percent, line[fname] or 0.0, grouping=True)
+                for fname in NDS_AMOUNT_FIELDS
+            }
+            for line in lines.read(list(NDS_AMOUNT_FIELDS))
+        }
+
+    def button_draft(self):
+        self.env['report.nds.cache'].sudo()._invalidate(self._name, self.ids)
+        return super().button_draft()
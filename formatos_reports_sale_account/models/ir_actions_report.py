@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+import io
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import api, models
+from odoo.tools import split_every
+from odoo.tools.pdf import merge_pdf
+
+_logger = logging.getLogger(__name__)
+
+NDS_CACHED_REPORTS = ('account.report_invoice', 'account.report_invoice_with_payments')
+# Every batch worker holds a database cursor and runs its own wkhtmltopdf
+NDS_BATCH_MAX_WORKERS_PARAM = 'formatos_reports_sale_account.batch_max_workers'
+NDS_BATCH_DEFAULT_MAX_WORKERS = 2
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf_prepare_streams(self, report_ref, data, res_ids=None):
+        """Serves posted invoices from the NDS report cache and stores the
+        ones that had to be rendered."""
+        report = self._get_report(report_ref)
+        if report.report_name not in NDS_CACHED_REPORTS or not res_ids:
+            return super()._render_qweb_pdf_prepare_streams(report_ref, data, res_ids=res_ids)
+        Cache = self.env['report.nds.cache'].sudo()
+        version = Cache._get_template_version(report)
+        moves = self.env[report.model].browse(res_ids)
+        keys = {move.id: Cache._get_key(report, move, version)
+                for move in moves if move.state == 'posted'}
+        cached = Cache._fetch(keys.values())
+        missing = [res_id for res_id in res_ids if keys.get(res_id) not in cached]
+        rendered = {}
+        if missing:
+            rendered = super()._render_qweb_pdf_prepare_streams(report_ref, data, res_ids=missing)
+            for res_id, stream_data in rendered.items():
+                if res_id in keys:
+                    Cache._store(keys[res_id], moves.browse(res_id),
+                                 stream_data['stream'].getvalue())
+        collected_streams = {}
+        for res_id in res_ids:
+            if res_id in rendered:
+                collected_streams[res_id] = rendered.pop(res_id)
+            elif res_id not in missing:
+                collected_streams[res_id] = {
+                    'stream': io.BytesIO(cached[keys[res_id]]),
+                    'attachment': None,
+                }
+        # unsplit output of wkhtmltopdf is returned under the False key
+        collected_streams.update(rendered)
+        return collected_streams
+
+    def _render_nds_chunk(self, report_ref, res_ids):
+        """Renders one chunk of documents with a single wkhtmltopdf call and
+        returns the pdf content of every document, split by record."""
+        streams = self._render_qweb_pdf_prepare_streams(
+            report_ref, {'report_type': 'pdf'}, res_ids=res_ids)
+        return [(res_id, stream_data['stream'].getvalue())
+                for res_id, stream_data in streams.items()]
+
+    def _render_nds_chunk_new_cursor(self, report_ref, res_ids):
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            return env['ir.actions.report']._render_nds_chunk(report_ref, res_ids)
+
+    def _nds_batch_is_committed(self, report, res_ids):
+        """Whether the documents are committed as they are seen by the current
+        transaction, i.e. whether a worker on a new cursor would render the
+        same content."""
+        self.env.flush_all()
+        table = self.env[report.model]._table
+        query = "SELECT id, write_date FROM %s WHERE id IN %%s" % table
+        self.env.cr.execute(query, [tuple(res_ids)])
+        current = dict(self.env.cr.fetchall())
+        with self.pool.cursor() as cr:
+            cr.execute(query, [tuple(res_ids)])
+            committed = dict(cr.fetchall())
+        return current == committed
+
+    @api.model
+    def _get_nds_batch_workers(self, workers):
+        """Clamps the requested workers to the configured limit and to the
+        number of CPUs."""
+        max_workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            NDS_BATCH_MAX_WORKERS_PARAM, NDS_BATCH_DEFAULT_MAX_WORKERS))
+        return max(1, min(int(workers or 1), max_workers, os.cpu_count() or 1))
+
+    @api.model
+    def render_nds_batch(self, report_ref, res_ids, chunk_size=100, workers=1, output='zip'):
+        """Renders many invoices or sale orders at once.
+
+        Documents are rendered by chunks so wkhtmltopdf runs once per chunk
+        instead of once per document. With ``workers`` > 1 the chunks are
+        rendered in parallel by threads, each one on its own cursor, so at
+        most ``workers`` wkhtmltopdf processes run at the same time.
+        ``workers`` is capped by the number of CPUs and by the
+        ``formatos_reports_sale_account.batch_max_workers`` system parameter
+        (2 by default). The threads only see committed data: when some
+        documents were created or changed in the current transaction, the
+        chunks are rendered sequentially on the current cursor instead.
+
+        :param report_ref: report xmlid, report_name or record
+        :param list res_ids: ids of the documents to render
+        :param int chunk_size: documents rendered per wkhtmltopdf call
+        :param int workers: chunks rendered concurrently
+        :param str output: 'zip' for one pdf per document named after the
+            document and its id, 'merge' for a
+            single pdf with every document
+        :returns: tuple (content, 'zip' or 'pdf')
+        """
+        report = self._get_report(report_ref)
+        start = time.time()
+        chunks = [list(chunk) for chunk in split_every(chunk_size, res_ids)]
+        workers = self._get_nds_batch_workers(workers)
+        if workers > 1 and res_ids and not self._nds_batch_is_committed(report, res_ids):
+            _logger.warning(
+                "Rendering %d %s documents sequentially: some of them are "
+                "not committed yet", len(res_ids), report.report_name)
+            workers = 1
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    lambda chunk: self._render_nds_chunk_new_cursor(report_ref, chunk),
+                    chunks)
+                content = self._pack_nds_batch(report, results, output)
+        else:
+            results = (self._render_nds_chunk(report_ref, chunk) for chunk in chunks)
+            content = self._pack_nds_batch(report, results, output)
+        elapsed = time.time() - start
+        _logger.info(
+            "Rendered %d %s documents in %.1fs (%.1f documents/s)",
+            len(res_ids), report.report_name, elapsed, len(res_ids) / (elapsed or 1))
+        return content, 'zip' if output == 'zip' else 'pdf'
+
+    def _pack_nds_batch(self, report, results, output):
+        if output == 'merge':
+            return merge_pdf([pdf for chunk in results for dummy, pdf in chunk])
+        records = self.env[report.model]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for chunk in results:
+                for res_id, pdf in chunk:
+                    if res_id:
+                        # the id keeps documents with the same name apart
+                        name = '%s_%s' % (records.browse(res_id).display_name or '', res_id)
+                    else:
+                        # wkhtmltopdf output could not be split by record
+                        name = 'documents_%s' % len(archive.namelist())
+                    archive.writestr('%s.pdf' % name.replace('/', '_'), pdf)
+        return buffer.getvalue()
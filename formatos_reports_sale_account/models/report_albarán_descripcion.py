@@ -20,10 +20,11 @@ class StockMoveLine(models.Model):
         returns: dictionary {same_key_as_super: {same_values_as_super, ...}
         """
         aggregated_move_lines = super()._get_aggregated_product_quantities(**kwargs)
-        if self.move_id and self.move_id.sale_line_id:
-            kit_name = self.move_id.sale_line_id.name
+        # read the sale line names of all the moves at once
+        self.move_id.sale_line_id.mapped('name')
+        for aggregated_move_line in aggregated_move_lines.values():
+            kit_name = aggregated_move_line['move'].sale_line_id.name
             if kit_name:
-                for aggregated_move_line in aggregated_move_lines:
-                    aggregated_move_lines[aggregated_move_line]['description'] = ""
-                    aggregated_move_lines[aggregated_move_line]['name'] = kit_name
+                aggregated_move_line['description'] = ""
+                aggregated_move_line['name'] = kit_name
         return aggregated_move_lines
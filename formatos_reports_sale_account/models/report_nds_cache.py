@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+import hashlib
+from datetime import timedelta
+
+import psycopg2
+
+from odoo import api, fields, models, tools
+
+CACHE_MAX_SIZE_PARAM = 'formatos_reports_sale_account.report_cache_max_size'
+CACHE_DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+# Groups that change the amounts shown by the NDS template
+CACHE_KEY_GROUPS = (
+    'account.group_show_line_subtotals_tax_excluded',
+    'account.group_show_line_subtotals_tax_included',
+)
+# Templates rendered by the cached reports besides the report itself: the
+# version covers them and every view inheriting from them
+CACHE_TEMPLATES = ('account.report_invoice_document', 'web.external_layout')
+# Last access of an entry is only refreshed once per interval, so that
+# concurrent downloads of the same pdf do not all write its row
+LAST_ACCESS_INTERVAL = timedelta(minutes=5)
+
+
+class ReportNdsCache(models.Model):
+    """PDF cache of the NDS reports of posted documents.
+
+    Entries are content addressed by document, write date, template version,
+    language, company and the groups of the user that change the rendered
+    amounts, stored as filestore attachments and evicted by last access
+    by an hourly cron once the total size goes over the configured cap.
+    """
+    _name = 'report.nds.cache'
+    _description = 'NDS report PDF cache'
+    _order = 'last_access'
+
+    key = fields.Char(required=True, index=True, readonly=True)
+    res_model = fields.Char(required=True, readonly=True)
+    res_id = fields.Integer(required=True, index=True, readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', required=True, readonly=True,
+                                    ondelete='cascade')
+    file_size = fields.Integer(readonly=True)
+    last_access = fields.Datetime(index=True, readonly=True,
+                                  default=fields.Datetime.now)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique (key)', 'The report cache key must be unique.'),
+    ]
+
+    @api.model
+    def _get_template_version(self, report):
+        """Changes whenever the report, one of its templates or any view
+        inheriting from them is updated, added or removed, e.g. by a module
+        upgrade."""
+        self.env['ir.ui.view'].flush_model(['key', 'inherit_id', 'write_date'])
+        self.env.cr.execute("""
+            WITH RECURSIVE tree AS (
+                SELECT id, write_date FROM ir_ui_view
+                 WHERE key IN %s AND inherit_id IS NULL
+                 UNION
+                SELECT view.id, view.write_date
+                  FROM ir_ui_view view JOIN tree ON view.inherit_id = tree.id
+            )
+            SELECT id, write_date FROM tree ORDER BY id
+        """, [(report.report_name,) + CACHE_TEMPLATES])
+        views = ','.join('%s:%s' % row for row in self.env.cr.fetchall())
+        return '%s|%s' % (report.write_date,
+                          hashlib.sha256(views.encode()).hexdigest())
+
+    @api.model
+    def _get_key(self, report, record, version):
+        lang = record.partner_id.lang or self.env.lang or ''
+        groups = ''.join('1' if self.env.user.has_group(group) else '0'
+                         for group in CACHE_KEY_GROUPS)
+        raw = '|'.join([report.report_name, record._name, str(record.id),
+                        str(record.write_date), version, lang,
+                        str(self.env.company.id), groups])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @api.model
+    def _fetch(self, keys):
+        """Returns {key: pdf content} for the cached keys and refreshes their
+        last access."""
+        entries = self.search([('key', 'in', list(keys))])
+        if not entries:
+            return {}
+        now = fields.Datetime.now()
+        entries.filtered(
+            lambda entry: entry.last_access < now - LAST_ACCESS_INTERVAL
+        ).write({'last_access': now})
+        return {entry.key: entry.attachment_id.raw for entry in entries}
+
+    @api.model
+    def _store(self, key, record, content):
+        """Stores a rendered pdf. When a concurrent download of the same
+        document stored it first, the entry is left as it is."""
+        try:
+            with self.env.cr.savepoint(), tools.mute_logger('odoo.sql_db'):
+                attachment = self.env['ir.attachment'].create({
+                    'name': '%s.pdf' % key,
+                    'raw': content,
+                    'mimetype': 'application/pdf',
+                    'res_model': self._name,
+                })
+                self.create({
+                    'key': key,
+                    'res_model': record._name,
+                    'res_id': record.id,
+                    'attachment_id': attachment.id,
+                    'file_size': len(content),
+                })
+        except psycopg2.errors.UniqueViolation:
+            return
+
+    @api.model
+    def _evict(self):
+        """Drops the least recently used entries above the size cap. Run by
+        the cron rather than on every store."""
+        max_size = int(self.env['ir.config_parameter'].sudo().get_param(
+            CACHE_MAX_SIZE_PARAM, CACHE_DEFAULT_MAX_SIZE))
+        self.flush_model(['file_size', 'last_access'])
+        self.env.cr.execute("""
+            SELECT id FROM (
+                SELECT id, sum(file_size) OVER (
+                           ORDER BY last_access DESC, id DESC) AS kept_size
+                  FROM report_nds_cache
+            ) entries
+             WHERE kept_size > %s
+        """, [max_size])
+        self.browse(row[0] for row in self.env.cr.fetchall()).unlink()
+
+    @api.model
+    def _invalidate(self, res_model, res_ids):
+        self.search([('res_model', '=', res_model), ('res_id', 'in', res_ids)]).unlink()
+
+    def unlink(self):
+        attachments = self.attachment_id
+        res = super().unlink()
+        attachments.unlink()
+        return res
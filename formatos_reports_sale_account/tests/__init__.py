@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+from . import test_batch_render
+from . import test_delivery_slip
+from . import test_nds_line_amounts
+from . import test_report_nds_cache
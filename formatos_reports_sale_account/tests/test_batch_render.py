@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+import io
+import logging
+import time
+import tracemalloc
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.ir_actions_report import NDS_BATCH_MAX_WORKERS_PARAM
+
+_logger = logging.getLogger(__name__)
+
+BENCHMARK_DOCUMENTS = 1000
+
+
+@tagged('post_install', '-at_install')
+class TestBatchRender(TransactionCase):
+    """Limite de hilos y nombres del zip del render por lotes"""
+
+    def test_workers_clamped(self):
+        Report = self.env['ir.actions.report']
+        self.env['ir.config_parameter'].sudo().set_param(
+            NDS_BATCH_MAX_WORKERS_PARAM, '3')
+        with patch('os.cpu_count', return_value=8):
+            self.assertEqual(Report._get_nds_batch_workers(64), 3)
+            self.assertEqual(Report._get_nds_batch_workers(2), 2)
+            self.assertEqual(Report._get_nds_batch_workers(0), 1)
+        with patch('os.cpu_count', return_value=2):
+            self.assertEqual(Report._get_nds_batch_workers(64), 2)
+
+    def test_zip_names_with_id(self):
+        # Dos documentos con el mismo nombre no se pisan en el zip
+        partners = self.env['res.partner'].create([
+            {'name': 'Cliente/Duplicado'}, {'name': 'Cliente/Duplicado'}])
+        report = self.env['ir.actions.report'].new({'model': 'res.partner'})
+        content = self.env['ir.actions.report']._pack_nds_batch(
+            report, [[(partners[0].id, b'%PDF-1'), (partners[1].id, b'%PDF-2')]],
+            'zip')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(archive.namelist(), [
+                'Cliente_Duplicado_%s.pdf' % partner.id for partner in partners])
+            self.assertEqual(archive.read(archive.namelist()[1]), b'%PDF-2')
+
+
+@tagged('post_install', '-at_install', '-standard', 'nds_benchmark')
+class TestBatchRenderBenchmark(AccountTestInvoicingCommon):
+    """Benchmark del render por lotes de 1000 facturas. No se ejecuta por
+    defecto: ``--test-tags nds_benchmark``."""
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        if cls.env['ir.actions.report'].get_wkhtmltopdf_state() != 'ok':
+            raise unittest.SkipTest('wkhtmltopdf no esta disponible')
+        cls.invoices = cls.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'partner_id': cls.partner_a.id,
+            'invoice_date': '2024-01-31',
+            'invoice_line_ids': [(0, 0, {
+                'product_id': cls.product_a.id,
+                'quantity': 1 + index % 5,
+                'price_unit': 100.0,
+            })],
+        } for index in range(BENCHMARK_DOCUMENTS)])
+
+    def test_batch_render_benchmark(self):
+        Report = self.env['ir.actions.report'].with_context(
+            force_report_rendering=True)
+        start = time.perf_counter()
+        content, content_type = Report.render_nds_batch(
+            'account.account_invoices', self.invoices.ids, workers=2)
+        elapsed = time.perf_counter() - start
+        # (1) una entrada del zip por factura
+        self.assertEqual(content_type, 'zip')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(len(archive.namelist()), BENCHMARK_DOCUMENTS)
+
+        # El pico de memoria se mide en otra pasada: tracemalloc ralentiza
+        # el render y falsearia el rendimiento de la primera. Solo cuenta
+        # la memoria de Python, no la de los procesos de wkhtmltopdf.
+        tracemalloc.start()
+        try:
+            content, content_type = Report.render_nds_batch(
+                'account.account_invoices', self.invoices.ids, output='merge')
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # (2) un unico pdf con todas las facturas
+        self.assertEqual(content_type, 'pdf')
+        self.assertTrue(content.startswith(b'%PDF'))
+        _logger.info(
+            "Render por lotes de %d facturas: %.1fs, %.1f documentos/s, "
+            "pico de memoria de Python %.1f MB",
+            BENCHMARK_DOCUMENTS, elapsed, BENCHMARK_DOCUMENTS / elapsed,
+            peak / 1024 / 1024)
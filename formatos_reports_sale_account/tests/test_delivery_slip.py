@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+import logging
+import time
+import unittest
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+# Lineas del albaran del benchmark y productos entre los que se reparten
+BENCHMARK_LINES = 2000
+BENCHMARK_PRODUCTS = 200
+
+
+@tagged('post_install', '-at_install')
+class TestDeliverySlip(TransactionCase):
+    """Nombres de kit de las lineas agregadas del albaran"""
+
+    def test_kit_names(self):
+        if 'sale_line_id' not in self.env['stock.move']._fields:
+            self.skipTest('sale_stock no esta instalado')
+        product_a, product_b = self.env['product.product'].create([
+            {'name': 'Producto A', 'type': 'consu'},
+            {'name': 'Producto B', 'type': 'consu'},
+        ])
+        order = self.env['sale.order'].create({
+            'partner_id': self.env['res.partner'].create({'name': 'Cliente'}).id,
+            'order_line': [
+                (0, 0, {'product_id': product_a.id, 'name': 'Kit A',
+                        'product_uom_qty': 2}),
+                (0, 0, {'product_id': product_b.id, 'name': 'Kit B',
+                        'product_uom_qty': 1}),
+            ],
+        })
+        order.action_confirm()
+        picking = order.picking_ids
+        picking.action_assign()
+        aggregated = picking.move_line_ids._get_aggregated_product_quantities()
+        # (1) cada linea agregada lleva el nombre de la linea de venta de su
+        # propio movimiento
+        # (2) sin la descripcion del producto
+        self.assertEqual(
+            sorted((values['product'].name, values['name'], values['description'])
+                   for values in aggregated.values()),
+            [('Producto A', 'Kit A', ''), ('Producto B', 'Kit B', '')])
+
+
+@tagged('post_install', '-at_install', '-standard', 'nds_benchmark')
+class TestDeliverySlipBenchmark(TransactionCase):
+    """Benchmark del albaran con miles de lineas de movimiento. No se
+    ejecuta por defecto: ``--test-tags nds_benchmark``."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if 'sale_line_id' not in cls.env['stock.move']._fields:
+            raise unittest.SkipTest('sale_stock no esta instalado')
+        products = cls.env['product.product'].create([
+            {'name': 'Producto %d' % index, 'type': 'consu'}
+            for index in range(BENCHMARK_PRODUCTS)])
+        partner = cls.env['res.partner'].create({'name': 'Cliente albaran'})
+        cls.order = cls.env['sale.order'].create({
+            'partner_id': partner.id,
+            'order_line': [(0, 0, {
+                'product_id': products[index % BENCHMARK_PRODUCTS].id,
+                'name': 'Kit %d' % index,
+                'product_uom_qty': 1,
+            }) for index in range(BENCHMARK_LINES)],
+        })
+        cls.order.action_confirm()
+        cls.picking = cls.order.picking_ids
+        cls.picking.action_assign()
+
+    def test_kit_names_benchmark(self):
+        move_lines = self.picking.move_line_ids
+        self.assertEqual(len(move_lines), BENCHMARK_LINES)
+        kit_names = {}
+        for sale_line in self.order.order_line:
+            kit_names.setdefault(sale_line.product_id, set()).add(sale_line.name)
+        move_lines.invalidate_recordset()
+        start = time.perf_counter()
+        aggregated = move_lines._get_aggregated_product_quantities()
+        aggregate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        self.env['ir.actions.report']._render_qweb_html(
+            'stock.report_deliveryslip', self.picking.ids)
+        render_time = time.perf_counter() - start
+        _logger.info(
+            "Albaran de %d lineas: agregacion %.3fs, render HTML %.3fs",
+            len(move_lines), aggregate_time, render_time)
+        # (1) cada linea agregada lleva el nombre de una linea de venta de su
+        # propio producto, no el de una linea cualquiera del albaran
+        # (2) y no conserva la descripcion del producto
+        for values in aggregated.values():
+            self.assertIn(values['name'], kit_names[values['product']])
+            self.assertEqual(values['description'], '')
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestNdsLineAmounts(AccountTestInvoicingCommon):
+    """Importes de las lineas de factura formateados para el report NDS"""
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.env['res.lang']._activate_lang('es_ES')
+        cls.partner_a.lang = 'es_ES'
+
+    def _create_invoice(self, currency, price_unit):
+        return self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner_a.id,
+            'invoice_date': '2024-01-31',
+            'currency_id': currency.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product_a.id,
+                'quantity': 2,
+                'price_unit': price_unit,
+                'tax_ids': [(6, 0, [])],
+            })],
+        })
+
+    def test_es_separators(self):
+        currency = self.env.ref('base.EUR')
+        currency.active = True
+        invoice = self._create_invoice(currency, 1234.5)
+        amounts = invoice._get_nds_line_amounts()
+        self.assertEqual(amounts, {invoice.invoice_line_ids.id: {
+            'price_unit': '1.234,50',
+            'price_subtotal': '2.469,00',
+            'price_total': '2.469,00',
+        }})
+
+    def test_zero_decimal_currency(self):
+        currency = self.env['res.currency'].create({
+            'name': 'ZZD', 'symbol': 'Z', 'rounding': 1.0})
+        self.assertEqual(currency.decimal_places, 0)
+        invoice = self._create_invoice(currency, 1234.6)
+        amounts = invoice._get_nds_line_amounts()[invoice.invoice_line_ids.id]
+        # (1) sin decimales ni separador decimal
+        # (2) el subtotal redondeado a la unidad de la moneda
+        self.assertEqual(amounts, {
+            'price_unit': '1.235',
+            'price_subtotal': '2.469',
+            'price_total': '2.469',
+        })
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# (c) 2024 Nexta - Jaume Basiero <jbasiero@nextads.es>
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/a
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+from ..models.report_nds_cache import CACHE_MAX_SIZE_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestReportNdsCache(AccountTestInvoicingCommon):
+    """Cache de PDF de las facturas publicadas"""
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.Cache = cls.env['report.nds.cache'].sudo()
+        cls.report = cls.env['ir.actions.report']._get_report('account.report_invoice')
+        cls.invoice = cls.init_invoice('out_invoice', amounts=[100.0], post=True)
+        cls.version = cls.Cache._get_template_version(cls.report)
+
+    def _key(self, invoice=None, version=None):
+        return self.Cache._get_key(self.report, invoice or self.invoice,
+                                   version or self.version)
+
+    def test_key(self):
+        key = self._key()
+        self.assertEqual(key, self._key())
+        # (1) la clave cambia con el documento, la version y la compañia
+        other = self.init_invoice('out_invoice', amounts=[100.0], post=True)
+        self.assertNotEqual(key, self._key(other))
+        self.assertNotEqual(key, self._key(version='otra'))
+        Cache = self.Cache.with_company(self.company_data_2['company'])
+        self.assertNotEqual(key, Cache._get_key(self.report, self.invoice, self.version))
+        # (2) y con los grupos que cambian los importes mostrados
+        group = self.env.ref('account.group_show_line_subtotals_tax_included')
+        self.env.user.groups_id = [(4, group.id)]
+        self.assertNotEqual(key, self._key())
+
+    def test_template_version(self):
+        # Una vista que hereda de la plantilla de la factura cambia la version
+        self.env['ir.ui.view'].create({
+            'name': 'report_invoice_document_test',
+            'type': 'qweb',
+            'inherit_id': self.env.ref('account.report_invoice_document').id,
+            'arch': '<xpath expr="//t[@t-set=\'lines\']" position="after"><span/></xpath>',
+        })
+        self.assertNotEqual(self.Cache._get_template_version(self.report),
+                            self.version)
+
+    def test_cache_hit(self):
+        self.Cache._store(self._key(), self.invoice, b'%PDF-cache')
+        streams = self.env['ir.actions.report']._render_qweb_pdf_prepare_streams(
+            'account.report_invoice', {'report_type': 'pdf'}, res_ids=self.invoice.ids)
+        self.assertEqual(list(streams), self.invoice.ids)
+        self.assertEqual(streams[self.invoice.id]['stream'].getvalue(), b'%PDF-cache')
+        # el mismo contenido guardado dos veces no duplica la entrada
+        self.Cache._store(self._key(), self.invoice, b'%PDF-cache')
+        self.assertEqual(self.Cache.search_count([('res_id', '=', self.invoice.id)]), 1)
+
+    def test_lru_eviction(self):
+        self.Cache.search([]).unlink()
+        self.env['ir.config_parameter'].sudo().set_param(CACHE_MAX_SIZE_PARAM, '10')
+        now = fields.Datetime.now()
+        entries = self.Cache.browse()
+        for index in range(3):
+            self.Cache._store('key-%s' % index, self.invoice, b'1234')
+            entry = self.Cache.search([('key', '=', 'key-%s' % index)])
+            entry.last_access = now - timedelta(hours=3 - index)
+            entries |= entry
+        # el primero se vuelve a leer y pasa a ser el mas reciente
+        entries[0].last_access = now
+        evicted_attachment = entries[1].attachment_id
+        self.Cache._evict()
+        self.assertEqual(self.Cache.search([]), entries[0] | entries[2])
+        self.assertFalse(evicted_attachment.exists())
+
+    def test_button_draft_invalidates(self):
+        self.Cache._store(self._key(), self.invoice, b'%PDF-cache')
+        self.invoice.button_draft()
+        self.assertFalse(self.Cache.search([('res_id', '=', self.invoice.id)]))
@@ -2,8 +2,8 @@
 # License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
 {
     "name": "Pre init custom css",
-    "summary": "Crea el fichero custom.css para evitar fallos",
-    "version": "14.0.1.0.3",
+    "summary": "Añade custom.css de mis_builder al bundle del backend",
+    "version": "16.0.1.2.0",
     "author": "NextaDS",
     "maintainers": ["Nextads"],
     "website": "https://www.nextads.es",
@@ -11,9 +11,9 @@
     "license": "AGPL-3",
     "depends": ["mis_builder"],
     "data": [
+        "data/ir_asset.xml",
     ],
     "application": False,
     "installable": True,
     "auto_install": False,
-    'pre_init_hook': '_pre_init_referral',
 }
@@ -0,0 +1 @@
+from . import test_custom_css
@@ -0,0 +1,10 @@
+from odoo.tests import TransactionCase, tagged
+
+CUSTOM_CSS = "pre_init_custom_css/static/src/css/custom.css"
+
+
+@tagged("post_install", "-at_install")
+class TestCustomCss(TransactionCase):
+    def test_backend_bundle_contains_custom_css(self):
+        paths = self.env["ir.asset"]._get_asset_paths("web.assets_backend", css=True)
+        self.assertIn(CUSTOM_CSS, [path[0] for path in paths])
@@ -20,7 +20,7 @@
 ################################################################################
 {
     'name': 'Project Sprint',
-    'version': '16.0.1.0.0',
+    'version': '16.0.1.2.0',
     'category': 'Project',
     'summary': 'A sprint is a fixed time period where teams complete work from'
                ' their product backlog',
@@ -32,6 +32,7 @@
     'maintainer': 'Cybrosys Techno Solutions',
     'website': "https://www.cybrosys.com",
     'depends': ['project'],
+    'external_dependencies': {'python': ['numpy']},
     'data': [
         'security/ir.model.access.csv',
         'views/project_sprint_views.xml',
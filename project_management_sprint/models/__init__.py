@@ -18,4 +18,5 @@
 #    (AGPL v3) along with this program.
 #    If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
-from . import project_project, project_task, project_sprint
+from . import project_project, project_task, project_sprint, \
+    project_sprint_forecast
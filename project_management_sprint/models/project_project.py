@@ -37,3 +37,11 @@ class ProjectProject(models.Model):
             'context': {'default_project_id': self.id},
             'domain': [('project_id', '=', self.id)],
         }
+
+    def get_sprint_forecast(self, horizon=None):
+        """Velocity and completion forecast from the completed sprints"""
+        self.ensure_one()
+        Forecast = self.env['project.sprint.forecast']
+        if horizon:
+            return Forecast.get_forecast(self.id, horizon=horizon)
+        return Forecast.get_forecast(self.id)
@@ -20,6 +20,10 @@
 ################################################################################
 from odoo import models, fields
 
+BOARD_TASK_FIELDS = ['name', 'stage_id', 'sequence', 'priority', 'user_ids',
+                     'date_deadline', 'is_blocked', 'issue_task_id',
+                     'write_date']
+
 
 class ProjectSprint(models.Model):
     """
@@ -49,8 +53,7 @@ class ProjectSprint(models.Model):
             'view_mode': 'kanban',
             'res_model': 'project.task',
             'views': [[False, 'kanban'], [False, 'tree'], [False, 'form']],
-            'domain': [('project_id', '=', self.project_id.id),
-                       ('sprint_id', '=', self.id)],
+            'domain': self._get_board_domain('sprint'),
             'context': "{'create': False}"
         }
 
@@ -62,8 +65,7 @@ class ProjectSprint(models.Model):
             'view_mode': 'kanban',
             'res_model': 'project.task',
             'views': [[False, 'kanban'], [False, 'tree'], [False, 'form']],
-            'domain': [('project_id', '=', self.project_id.id),
-                       ('sprint_id', '=', False)],
+            'domain': self._get_board_domain('backlog'),
             'context': "{'create': False}"
         }
 
@@ -75,10 +77,62 @@ class ProjectSprint(models.Model):
             'view_mode': 'kanban',
             'res_model': 'project.task',
             'views': [[False, 'kanban'], [False, 'tree'], [False, 'form']],
-            'domain': [('project_id', '=', self.project_id.id)],
+            'domain': self._get_board_domain('all'),
             'context': "{'create': False}"
         }
 
+    def _get_board_domain(self, scope='sprint'):
+        """Task domain of the sprint board for the given scope"""
+        domain = [('project_id', '=', self.project_id.id)]
+        if scope == 'sprint':
+            domain.append(('sprint_id', '=', self.id))
+        elif scope == 'backlog':
+            domain.append(('sprint_id', '=', False))
+        elif scope != 'all':
+            raise ValueError("Unknown board scope: %s" % scope)
+        return domain
+
+    def get_board_data(self, scope='sprint'):
+        """Kanban cards of the sprint grouped by stage in a single read.
+
+        :param str scope: 'sprint' for the sprint tasks, 'backlog' for the
+            project tasks without sprint, 'all' for every project task.
+        :returns: dict with the board ``version`` (number of cards and last
+            task write date, so that removed cards change it too) and the
+            ``stages`` list, each stage carrying its ``cards``.
+        """
+        self.ensure_one()
+        tasks = self.env['project.task'].search_read(
+            self._get_board_domain(scope), BOARD_TASK_FIELDS,
+            order='sequence, id')
+        stages = self.project_id.type_ids
+        columns = {stage.id: {'id': stage.id, 'name': stage.name,
+                              'fold': stage.fold, 'cards': []}
+                   for stage in stages}
+        version = False
+        for task in tasks:
+            write_date = task.pop('write_date')
+            if not version or write_date > version:
+                version = write_date
+            stage = task['stage_id']
+            stage_id = stage[0] if stage else False
+            if stage_id not in columns:
+                columns[stage_id] = {'id': stage_id,
+                                     'name': stage[1] if stage else False,
+                                     'fold': False, 'cards': []}
+            task['stage_id'] = stage_id
+            task['issue_task_id'] = task['issue_task_id'] and \
+                task['issue_task_id'][0]
+            columns[stage_id]['cards'].append(task)
+        return {
+            'sprint_id': self.id,
+            'scope': scope,
+            'version': '%d-%s' % (
+                len(tasks),
+                version and fields.Datetime.to_string(version) or ''),
+            'stages': list(columns.values()),
+        }
+
     def action_start_sprint(self):
         """Sprint state to ongoing"""
         self.write({'state': 'ongoing'})
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2023-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev K P (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU AFFERO
+#    GENERAL PUBLIC LICENSE (AGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU AFFERO GENERAL PUBLIC LICENSE (AGPL v3) for more details.
+#
+#    You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+#    (AGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+import logging
+
+from odoo import api, models, tools
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    _logger.debug("numpy is not installed, sprint forecasts are unavailable")
+    np = None
+
+# Simulated sprint sequences of the Monte Carlo forecast
+FORECAST_TRIALS = 10000
+# Sprints ahead of the forecast
+FORECAST_HORIZON = 12
+
+
+class ProjectSprintForecast(models.AbstractModel):
+    """
+    Velocity and completion forecast of the sprints of a project
+    """
+    _name = 'project.sprint.forecast'
+    _description = 'Sprint forecast'
+
+    @api.model
+    def _get_history_watermark(self, project_id):
+        """Changes when a sprint of the project is completed or reopened"""
+        self.env['project.sprint'].flush_model(['project_id', 'state'])
+        self.env.cr.execute("""
+            SELECT count(*), max(write_date) FROM project_sprint
+             WHERE project_id = %s AND state = 'completed'
+        """, [project_id])
+        count, write_date = self.env.cr.fetchone()
+        return count, write_date and write_date.isoformat()
+
+    @api.model
+    @tools.ormcache('project_id', 'watermark')
+    def _get_sprint_history(self, project_id, watermark):
+        """Done and carried over tasks and hours of every completed sprint,
+        read in two queries and cached until a sprint closes.
+
+        :returns: tuple (sprints as tuples (id, name), done tasks,
+            carried over tasks, done hours, carried over hours), each a
+            tuple ordered by sprint end date.
+        """
+        sprints = self.env['project.sprint'].sudo().search_read(
+            [('project_id', '=', project_id), ('state', '=', 'completed')],
+            ['name'], order='end_date, id')
+        index = {sprint['id']: i for i, sprint in enumerate(sprints)}
+        counts = np.zeros((2, len(sprints)))
+        hours = np.zeros((2, len(sprints)))
+        groups = self.env['project.task'].sudo().with_context(
+            active_test=False).read_group(
+            [('sprint_id', 'in', list(index))], ['planned_hours:sum'],
+            ['sprint_id', 'is_closed'], lazy=False)
+        for group in groups:
+            row = 0 if group['is_closed'] else 1
+            col = index[group['sprint_id'][0]]
+            counts[row, col] = group['__count']
+            hours[row, col] = group['planned_hours'] or 0.0
+        return (tuple((sprint['id'], sprint['name']) for sprint in sprints),
+                tuple(counts[0].tolist()), tuple(counts[1].tolist()),
+                tuple(hours[0].tolist()), tuple(hours[1].tolist()))
+
+    @api.model
+    def _get_remaining_work(self, project_id):
+        """Open tasks of the project: number and hours, in total and in the
+        ongoing sprints. The total includes the open tasks left in completed
+        sprints, which are the ones counted as carried over."""
+        Task = self.env['project.task'].sudo()
+        domain = [('project_id', '=', project_id), ('is_closed', '=', False)]
+        result = {}
+        for key, extra in (('total', []),
+                           ('ongoing', [('sprint_id.state', '=', 'ongoing')])):
+            group = Task.read_group(domain + extra, ['planned_hours:sum'], [],
+                                    lazy=False)[0]
+            result[key] = (group['__count'], group['planned_hours'] or 0.0)
+        return result
+
+    @api.model
+    def _simulate(self, velocity, remaining, current, horizon, trials, seed):
+        """Monte Carlo forecast: ``trials`` sequences of ``horizon`` sprints
+        whose velocities are drawn from the history, simulated at once.
+
+        :returns: dict with the probability to finish the remaining work
+            within each of the next sprints, the sprints needed at the 50,
+            85 and 95 percentiles, and the probability to finish the open
+            work of the ongoing sprints in one sprint.
+        """
+        rng = np.random.default_rng(seed)
+        samples = rng.choice(velocity, size=(trials, horizon))
+        finished = samples.cumsum(axis=1) >= remaining
+        probability = finished.mean(axis=0)
+        # sprints needed by every trial, horizon + 1 when not finished
+        needed = np.sort(np.where(finished.any(axis=1),
+                                  finished.argmax(axis=1) + 1, horizon + 1))
+        percentiles = needed[np.ceil(np.array([0.5, 0.85, 0.95]) * trials)
+                             .astype(int) - 1]
+        return {
+            'probability_by_sprint': [round(float(p), 4) for p in probability],
+            'sprints_p50': int(percentiles[0]),
+            'sprints_p85': int(percentiles[1]),
+            'sprints_p95': int(percentiles[2]),
+            'ongoing_probability': round(float(
+                (samples[:, 0] >= current).mean()), 4),
+        }
+
+    @api.model
+    def get_forecast(self, project_id, horizon=FORECAST_HORIZON,
+                     trials=FORECAST_TRIALS):
+        """Velocity, carry-over and completion forecast of a project.
+
+        Velocity is the number of tasks closed per completed sprint, and
+        carry-over the share of the tasks of a sprint left open at its end.
+        Sprints needed beyond ``horizon`` are reported as ``horizon + 1``.
+        """
+        if np is None:
+            raise ImportError("The numpy python package is required")
+        sprints, done, carried, done_hours, carried_hours = \
+            self._get_sprint_history(
+                project_id, self._get_history_watermark(project_id))
+        done, carried = np.array(done), np.array(carried)
+        planned = done + carried
+        carry_over = np.divide(carried, planned, out=np.zeros_like(planned),
+                               where=planned > 0)
+        remaining = self._get_remaining_work(project_id)
+        result = {
+            'project_id': project_id,
+            'sprint_count': len(sprints),
+            'velocity': {
+                'mean': float(done.mean()) if len(done) else 0.0,
+                'std': float(done.std()) if len(done) else 0.0,
+                'recent': float(done[-3:].mean()) if len(done) else 0.0,
+                'hours_mean': float(np.mean(done_hours)) if len(done) else 0.0,
+            },
+            'carry_over_rate': float(carry_over.mean()) if len(done) else 0.0,
+            'remaining': {'tasks': remaining['total'][0],
+                          'hours': remaining['total'][1]},
+            'history': [{
+                'sprint_id': sprint_id,
+                'name': name,
+                'done': int(done[i]),
+                'carried_over': int(carried[i]),
+                'done_hours': done_hours[i],
+                'carried_over_hours': carried_hours[i],
+                'carry_over_rate': float(carry_over[i]),
+            } for i, (sprint_id, name) in enumerate(sprints)],
+            'forecast': False,
+        }
+        if done.any():
+            result['forecast'] = self._simulate(
+                done, remaining['total'][0], remaining['ongoing'][0],
+                horizon, trials, seed=project_id)
+        return result
@@ -29,12 +29,22 @@ class ProjectTask(models.Model):
     _inherit = 'project.task'
 
     sprint_id = fields.Many2one('project.sprint', string="Sprint",
-                                help="Sprint",
+                                help="Sprint", index=True,
                                 domain="[('project_id', '=', project_id)]")
     linked_issue = fields.Selection(string="Linked issue", selection=[
         ('is_blocked_by', 'Is blocked by')], help="Linked Issue")
     issue_task_id = fields.Many2one('project.task', string="Task",
                                     help="Task")
+    is_blocked = fields.Boolean(string="Blocked",
+                                compute='_compute_is_blocked', store=True,
+                                help="Task is blocked by a linked issue")
+
+    @api.depends('linked_issue', 'issue_task_id')
+    def _compute_is_blocked(self):
+        """Blocked when the task is linked to a blocking issue"""
+        for task in self:
+            task.is_blocked = bool(task.linked_issue == 'is_blocked_by'
+                                   and task.issue_task_id)
 
     @api.onchange('stage_id')
     def _onchange_stage_id(self):
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2023-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev K P (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU AFFERO
+#    GENERAL PUBLIC LICENSE (AGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU AFFERO GENERAL PUBLIC LICENSE (AGPL v3) for more details.
+#
+#    You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+#    (AGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.project_sprint import BOARD_TASK_FIELDS
+
+
+@tagged('post_install', '-at_install')
+class TestSprintBoard(TransactionCase):
+    """
+    Board data of a sprint read in a single request
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Stage = cls.env['project.task.type']
+        cls.stage_todo = Stage.create({'name': 'To Do', 'sequence': 1})
+        cls.stage_done = Stage.create({'name': 'Done', 'sequence': 2,
+                                       'fold': True})
+        cls.project = cls.env['project.project'].create({
+            'name': 'Board project',
+            'type_ids': [(6, 0, (cls.stage_todo | cls.stage_done).ids)],
+        })
+        cls.sprint = cls.env['project.sprint'].create({
+            'name': 'Sprint 1', 'project_id': cls.project.id})
+        Task = cls.env['project.task']
+        cls.task_todo = Task.create({
+            'name': 'Todo', 'project_id': cls.project.id,
+            'sprint_id': cls.sprint.id, 'stage_id': cls.stage_todo.id})
+        cls.task_done = Task.create({
+            'name': 'Done', 'project_id': cls.project.id,
+            'sprint_id': cls.sprint.id, 'stage_id': cls.stage_done.id})
+        cls.task_backlog = Task.create({
+            'name': 'Backlog', 'project_id': cls.project.id,
+            'stage_id': cls.stage_todo.id})
+
+    def _cards(self, board):
+        return {stage['id']: [card['id'] for card in stage['cards']]
+                for stage in board['stages']}
+
+    def test_board_grouped_by_stage(self):
+        """Cards of each scope are grouped under their stage"""
+        board = self.sprint.get_board_data()
+        self.assertEqual(self._cards(board), {
+            self.stage_todo.id: [self.task_todo.id],
+            self.stage_done.id: [self.task_done.id],
+        })
+        self.assertEqual(board['stages'][1]['fold'], True)
+        backlog = self.sprint.get_board_data('backlog')
+        self.assertEqual(self._cards(backlog)[self.stage_todo.id],
+                         [self.task_backlog.id])
+        self.assertEqual(len(sum(self._cards(
+            self.sprint.get_board_data('all')).values(), [])), 3)
+        with self.assertRaises(ValueError):
+            self.sprint.get_board_data('unknown')
+
+    def test_board_card_fields(self):
+        """Cards only carry the projected fields, with plain ids"""
+        card = self.sprint.get_board_data()['stages'][0]['cards'][0]
+        expected = set(BOARD_TASK_FIELDS) - {'write_date'} | {'id'}
+        self.assertEqual(set(card), expected)
+        self.assertEqual(card['stage_id'], self.stage_todo.id)
+        self.assertFalse(card['issue_task_id'])
+
+    def test_is_blocked(self):
+        """The stored blocked flag follows the linked issue"""
+        self.assertFalse(self.task_todo.is_blocked)
+        self.task_todo.write({'linked_issue': 'is_blocked_by',
+                              'issue_task_id': self.task_done.id})
+        self.assertTrue(self.task_todo.is_blocked)
+        self.assertEqual(self.env['project.task'].search([
+            ('id', '=', self.task_todo.id), ('is_blocked', '=', True)]),
+            self.task_todo)
+        card = self.sprint.get_board_data()['stages'][0]['cards'][0]
+        self.assertTrue(card['is_blocked'])
+        self.assertEqual(card['issue_task_id'], self.task_done.id)
+        self.task_todo.linked_issue = False
+        self.assertFalse(self.task_todo.is_blocked)
+
+    def test_board_version(self):
+        """Adding or removing a card changes the board version"""
+        version = self.sprint.get_board_data()['version']
+        task = self.env['project.task'].create({
+            'name': 'New', 'project_id': self.project.id,
+            'sprint_id': self.sprint.id, 'stage_id': self.stage_todo.id})
+        added = self.sprint.get_board_data()['version']
+        self.assertNotEqual(added, version)
+        task.unlink()
+        removed = self.sprint.get_board_data()['version']
+        self.assertNotEqual(removed, added)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2023-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author: Bhagyadev K P (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU AFFERO
+#    GENERAL PUBLIC LICENSE (AGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU AFFERO GENERAL PUBLIC LICENSE (AGPL v3) for more details.
+#
+#    You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+#    (AGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+import logging
+import time
+import unittest
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.project_sprint_forecast import np
+
+_logger = logging.getLogger(__name__)
+
+# Completed sprints of the benchmark and tasks per sprint
+BENCHMARK_SPRINTS = 300
+BENCHMARK_TASKS = 10
+
+
+@tagged('post_install', '-at_install')
+class TestSprintForecast(TransactionCase):
+    """
+    Velocity and remaining work of the sprint forecast
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if np is None:
+            raise unittest.SkipTest('numpy is not installed')
+        Stage = cls.env['project.task.type']
+        cls.stage_open = Stage.create({'name': 'Open'})
+        cls.stage_done = Stage.create({'name': 'Done', 'fold': True})
+        cls.project = cls.env['project.project'].create({
+            'name': 'Forecast project',
+            'type_ids': [(6, 0, (cls.stage_open | cls.stage_done).ids)],
+        })
+        Sprint = cls.env['project.sprint']
+        cls.sprint_done = Sprint.create({
+            'name': 'Sprint 1', 'project_id': cls.project.id,
+            'state': 'completed'})
+        cls.sprint_ongoing = Sprint.create({
+            'name': 'Sprint 2', 'project_id': cls.project.id,
+            'state': 'ongoing'})
+        tasks = [
+            (cls.sprint_done, cls.stage_done),
+            (cls.sprint_done, cls.stage_done),
+            (cls.sprint_done, cls.stage_open),
+            (cls.sprint_ongoing, cls.stage_open),
+            (cls.sprint_ongoing, cls.stage_open),
+            (Sprint, cls.stage_open),
+        ]
+        cls.env['project.task'].create([{
+            'name': 'Task %s' % index,
+            'project_id': cls.project.id,
+            'sprint_id': sprint.id,
+            'stage_id': stage.id,
+            'planned_hours': 2.0,
+        } for index, (sprint, stage) in enumerate(tasks)])
+
+    def test_forecast(self):
+        """Completed sprint history and open work of the project"""
+        forecast = self.env['project.sprint.forecast'].get_forecast(
+            self.project.id, trials=100)
+        history = forecast['history']
+        self.assertEqual([(sprint['done'], sprint['carried_over'])
+                          for sprint in history], [(2, 1)])
+        self.assertEqual(forecast['velocity']['mean'], 2.0)
+        # the task left open in the completed sprint is still to be done
+        self.assertEqual(forecast['remaining'], {'tasks': 4, 'hours': 8.0})
+        self.assertEqual(forecast['forecast']['sprints_p50'], 2)
+
+
+@tagged('post_install', '-at_install', '-standard', 'sprint_benchmark')
+class TestSprintForecastBenchmark(TransactionCase):
+    """
+    Forecast of a project with hundreds of completed sprints, run with
+    ``--test-tags sprint_benchmark``
+    """
+
+    def test_forecast_benchmark(self):
+        """First forecast reads the history, the next ones hit the cache"""
+        if np is None:
+            self.skipTest('numpy is not installed')
+        done_stage = self.env['project.task.type'].create({
+            'name': 'Done', 'fold': True})
+        project = self.env['project.project'].create({
+            'name': 'Benchmark project', 'type_ids': [(6, 0, done_stage.ids)]})
+        sprints = self.env['project.sprint'].create([{
+            'name': 'Sprint %s' % index, 'project_id': project.id,
+            'state': 'completed'} for index in range(BENCHMARK_SPRINTS)])
+        self.env['project.task'].create([{
+            'name': 'Task %s' % index,
+            'project_id': project.id,
+            'sprint_id': sprint.id,
+            'stage_id': done_stage.id if index % 4 else False,
+        } for sprint in sprints for index in range(BENCHMARK_TASKS)])
+        Forecast = self.env['project.sprint.forecast']
+        start = time.perf_counter()
+        forecast = Forecast.get_forecast(project.id)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        Forecast.get_forecast(project.id)
+        cached = time.perf_counter() - start
+        _logger.info("Forecast of %d sprints: %.3fs, %.3fs from the cache",
+                     BENCHMARK_SPRINTS, first, cached)
+        self.assertEqual(forecast['sprint_count'], BENCHMARK_SPRINTS)